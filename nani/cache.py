@@ -0,0 +1,143 @@
+"""
+Opt-in process wide cache for translation rows.
+
+Enable it in your settings:
+
+    NANI_TRANSLATION_CACHE = True
+
+By default the default cache of Django's cache framework is used, set
+NANI_TRANSLATION_CACHE_BACKEND to any value accepted by
+django.core.cache.get_cache to use another one. Entries expire after
+NANI_TRANSLATION_CACHE_TIMEOUT seconds (defaults to the timeout of the backend).
+
+Translation rows are cached by (database alias, translations model, master pk,
+language_code), shared rows by (database alias, shared model, pk). Both are stored as tuples of the field
+values, the same way they come out of the database.
+"""
+from django.conf import settings
+from django.core.cache import cache as default_cache, get_cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+class TranslationCache(object):
+    """
+    Reads and writes serialized rows from and to the cache backend and counts
+    hits and misses.
+    """
+    def __init__(self):
+        self._backends = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'NANI_TRANSLATION_CACHE', False)
+
+    @property
+    def backend(self):
+        name = getattr(settings, 'NANI_TRANSLATION_CACHE_BACKEND', None)
+        if not name:
+            return default_cache
+        if name not in self._backends:
+            self._backends[name] = get_cache(name)
+        return self._backends[name]
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'NANI_TRANSLATION_CACHE_TIMEOUT', None)
+
+    #===========================================================================
+    # Keys and (de)serialization
+    #===========================================================================
+
+    def _key(self, using, model, pk, language_code=None):
+        opts = model._meta
+        key = 'nani:%s:%s.%s:%s' % (using, opts.app_label, opts.object_name.lower(), pk)
+        if language_code:
+            key = '%s:%s' % (key, language_code)
+        return key
+
+    def _using(self, instance):
+        return instance._state.db or DEFAULT_DB_ALIAS
+
+    def shared_key(self, model, pk, using):
+        return self._key(using, model, pk)
+
+    def translation_key(self, model, master_pk, language_code, using):
+        return self._key(using, model._meta.translations_model, master_pk, language_code)
+
+    def _dump(self, instance):
+        return tuple([getattr(instance, field.attname) for field in instance._meta.fields])
+
+    def _load(self, model, row, using):
+        obj = model(*row)
+        obj._state.adding = False
+        obj._state.db = using
+        return obj
+
+    #===========================================================================
+    # API
+    #===========================================================================
+
+    def get_translation(self, instance, language_code):
+        """
+        Get the cached translation of 'instance' in 'language_code' or None.
+        """
+        key = self.translation_key(instance.__class__, instance.pk, language_code,
+                                   self._using(instance))
+        row = self.backend.get(key)
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._load(instance._meta.translations_model, row, self._using(instance))
+
+    def set_translation(self, model, trans):
+        key = self.translation_key(model, trans.master_id, trans.language_code,
+                                   self._using(trans))
+        self.backend.set(key, self._dump(trans), self.timeout)
+
+    def get_combined(self, model, pk, language_code, using):
+        """
+        Get the translation in 'language_code' of the instance of 'model' with
+        primary key 'pk' in database 'using', with its master set, or None if
+        either of them is not cached.
+        """
+        shared_key = self.shared_key(model, pk, using)
+        translation_key = self.translation_key(model, pk, language_code, using)
+        rows = self.backend.get_many([shared_key, translation_key])
+        if shared_key not in rows or translation_key not in rows:
+            self.misses += 1
+            return None
+        self.hits += 1
+        shared = self._load(model, rows[shared_key], using)
+        trans = self._load(model._meta.translations_model, rows[translation_key], using)
+        trans.master = shared
+        return trans
+
+    def set_combined(self, combined, trans):
+        model = combined.__class__
+        using = self._using(combined)
+        self.backend.set_many({
+            self.shared_key(model, combined.pk, using): self._dump(combined),
+            self.translation_key(model, combined.pk, trans.language_code, using): self._dump(trans),
+        }, self.timeout)
+
+    def invalidate_shared(self, model, pks, using):
+        if pks:
+            self.backend.delete_many([self.shared_key(model, pk, using) for pk in pks])
+
+    def invalidate_translations(self, model, pairs, using):
+        """
+        Invalidate the translations given as (master pk, language_code) pairs
+        in database 'using'.
+        """
+        if pairs:
+            self.backend.delete_many([self.translation_key(model, pk, code, using)
+                                      for pk, code in pairs])
+
+
+translation_cache = TranslationCache()
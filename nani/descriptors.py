@@ -1,4 +1,5 @@
-from nani.utils import get_translation
+from nani.utils import (cache_translation, get_cached_translation, 
+    get_translation, load_deferred_fields)
 
 class NULL:pass
 
@@ -10,10 +11,10 @@ class BaseDescriptor(object):
         self.opts = opts
     
     def translation(self, instance):
-        cached = getattr(instance, self.opts.translations_cache, None)
+        cached = get_cached_translation(instance)
         if not cached:
             cached = get_translation(instance)
-            setattr(instance, self.opts.translations_cache, cached)
+            cache_translation(instance, cached)
         return cached
 
 
@@ -31,12 +32,19 @@ class TranslatedAttribute(BaseDescriptor):
         if not instance:
             # Don't raise an attribute error so we can use it in admin.
             return self.opts.translations_model._meta.get_field_by_name(self.name)[0].default
-        return getattr(self.translation(instance), self.name)
+        trans = self.translation(instance)
+        if trans._deferred and self.name not in trans.__dict__:
+            # load all deferred fields at once, not one query per field
+            load_deferred_fields(trans)
+        return getattr(trans, self.name)
     
     def __set__(self, instance, value):
         if not instance:
             raise AttributeError()
-        setattr(self.translation(instance), self.name, value)
+        trans = self.translation(instance)
+        setattr(trans, self.name, value)
+        # remember it for partial writes (see BaseTranslationModel)
+        trans._changed_fields.add(self.name)
     
     def __delete__(self, instance):
         if not instance:
@@ -65,6 +73,9 @@ class LanguageCodeAttribute(TranslatedAttribute):
         This is used to translate instances.
         
         This will also refresh the translations cache attribute on the instance.
+        Translations which were already loaded for the instance are reused
+        from its per-language cache, so switching back and forth between
+        languages does not hit the database again.
         
         EG:
         
@@ -93,7 +104,7 @@ class LanguageCodeAttribute(TranslatedAttribute):
                 setattr(other_lang, field, val)
             other_lang.language_code = value
             other_lang.master = instance
-        setattr(instance, instance._meta.translations_cache, other_lang)
+        cache_translation(instance, other_lang)
     
     def __delete__(self, instance):
         if not instance:
@@ -1,4 +1,5 @@
 from django.core.exceptions import FieldError
+from django.db import router
 from django.forms.forms import get_declared_fields
 from django.forms.models import (ModelForm, ModelFormMetaclass, ModelFormOptions, 
     fields_for_model, model_to_dict, save_instance)
@@ -6,7 +7,8 @@ from django.forms.util import ErrorList
 from django.forms.widgets import media_property
 from django.utils.translation import get_language
 from nani.models import TranslateableModel
-from nani.utils import get_cached_translation, get_translation, combine
+from nani.utils import (cache_translation, combine, commit_on_success,
+    get_cached_translation, get_translation)
 
 class TranslateableModelFormMetaclass(ModelFormMetaclass):
     def __new__(cls, name, bases, attrs):
@@ -96,21 +98,33 @@ class TranslateableModelForm(ModelForm):
                                                      empty_permitted, instance)
 
     def save(self, commit=True):
+        """
+        Put the translated fields on the translation of the instance, then save
+        the instance, which saves its translation along with it in a single
+        transaction (see TranslateableModel.save).
+        """
         if self.instance.pk is None:
             fail_message = 'created'
         else:
             fail_message = 'changed'
-        super(TranslateableModelForm, self).save(True)
         trans_model = self.instance._meta.translations_model
         language_code = self.cleaned_data.get('language_code', get_language())
         trans = get_cached_translation(self.instance)
-        if not trans:
+        if not trans and self.instance.pk is not None:
             try:
                 trans = get_translation(self.instance, language_code)
             except trans_model.DoesNotExist:
-                trans = trans_model()
+                pass
+        if not trans:
+            trans = trans_model()
         trans = save_instance(self, trans, self._meta.fields, fail_message,
-                              commit, construct=True)
+                              commit=False, construct=True)
         trans.language_code = language_code
         trans.master = self.instance
+        cache_translation(self.instance, trans)
+        if commit:
+            using = router.db_for_write(self.instance.__class__, instance=self.instance)
+            commit_on_success(using, super(TranslateableModelForm, self).save, True)
+        else:
+            super(TranslateableModelForm, self).save(False)
         return combine(trans)
\ No newline at end of file
@@ -0,0 +1,53 @@
+from django.db import DatabaseError, connections, transaction
+from django.db.backends.util import truncate_name
+from django.db.models import get_models, signals
+from nani.models import BaseTranslationModel
+
+
+def sql_translations_indexes(model, connection):
+    """
+    Returns the CREATE INDEX statements for the composite indexes declared
+    with 'index_together' in the meta of the translations model 'model'.
+    """
+    opts = model._meta
+    qn = connection.ops.quote_name
+    output = []
+    for field_names in getattr(opts, 'index_together', []):
+        columns = [opts.get_field(name).column for name in field_names]
+        index_name = '%s_%s' % (opts.db_table, connection.creation._digest(*columns))
+        output.append('CREATE INDEX %s ON %s (%s);' % (
+            qn(truncate_name(index_name, connection.ops.max_name_length())),
+            qn(opts.db_table),
+            ', '.join([qn(column) for column in columns]),
+        ))
+    return output
+
+
+def create_translations_indexes(sender, created_models, verbosity=1, db=None, **kwargs):
+    """
+    Create the composite indexes of the translations models created by syncdb.
+    """
+    connection = connections[db or 'default']
+    cursor = connection.cursor()
+    for model in get_models(sender):
+        if model not in created_models or not issubclass(model, BaseTranslationModel):
+            continue
+        statements = sql_translations_indexes(model, connection)
+        if statements and verbosity >= 2:
+            print "Installing composite indexes for %s.%s model" % (
+                model._meta.app_label, model._meta.object_name)
+        for sql in statements:
+            # flush sends post_syncdb for all models, so the index might
+            # already exist.
+            sid = transaction.savepoint(using=connection.alias)
+            try:
+                cursor.execute(sql)
+            except DatabaseError:
+                transaction.savepoint_rollback(sid, using=connection.alias)
+            else:
+                transaction.savepoint_commit(sid, using=connection.alias)
+    transaction.commit_unless_managed(using=connection.alias)
+
+
+signals.post_syncdb.connect(create_translations_indexes,
+    dispatch_uid='nani.management.create_translations_indexes')
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import get_model, get_models
+from nani.models import TranslateableModel
+from optparse import make_option
+
+
+class Command(BaseCommand):
+    option_list = BaseCommand.option_list + (
+        make_option('--languages', dest='languages', default=None,
+            help='Comma separated list of language codes to check. Defaults to settings.LANGUAGES.'),
+        make_option('--list-missing', action='store_true', dest='list_missing', default=False,
+            help='Also list the primary keys of the objects missing a language.'),
+    )
+    help = 'Reports how many objects of translated models are translated to each language.'
+    args = '[appname.ModelName ...]'
+
+    def handle(self, *labels, **options):
+        if options.get('languages'):
+            languages = options['languages'].split(',')
+        else:
+            languages = [code for code, name in settings.LANGUAGES]
+        if labels:
+            models = []
+            for label in labels:
+                try:
+                    app_label, model_name = label.split('.')
+                except ValueError:
+                    raise CommandError('Models must be given as appname.ModelName, not %r' % label)
+                model = get_model(app_label, model_name)
+                if model is None or not issubclass(model, TranslateableModel):
+                    raise CommandError('%r is not a translated model' % label)
+                models.append(model)
+        else:
+            models = [model for model in get_models() if issubclass(model, TranslateableModel)]
+        output = []
+        for model in models:
+            opts = model._meta
+            output.append('%s.%s' % (opts.app_label, opts.object_name))
+            coverage = model.objects.translation_coverage(languages)
+            for code in languages:
+                info = coverage[code]
+                total = info['count'] + info['missing_count']
+                if total:
+                    percent = 100.0 * info['count'] / total
+                else:
+                    percent = 100.0
+                output.append('  %s: %d/%d (%.1f%%), %d missing' % (
+                    code, info['count'], total, percent, info['missing_count']))
+                if options.get('list_missing') and info['missing_count']:
+                    pks = info['missing'].values_list('pk', flat=True).iterator()
+                    output.append('    %s' % ', '.join([str(pk) for pk in pks]))
+        return '\n'.join(output) + '\n'
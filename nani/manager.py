@@ -1,44 +1,110 @@
-from django.db import models
-from django.db.models.query import QuerySet, ValuesQuerySet
+from django.conf import settings
+from django.db import connections, models
+from django.db.models import Count, sql
+from django.db.models.fields import AutoField
+from django.db.models.query import (QuerySet, ValuesQuerySet,
+    ValuesListQuerySet, insert_query)
 from django.db.models.query_utils import Q
+from django.db.models.signals import pre_delete, post_delete
+from django.db.models.sql.constants import LOOKUP_SEP
+from django.db.models.sql.where import AND, Constraint
+from django.dispatch.dispatcher import _make_id
 from django.utils.translation import get_language
-from nani.utils import R, combine
+from nani.cache import translation_cache
+from nani.utils import R, cache_translation, combine, commit_on_success
 
-class FieldTranslator(dict):
+def _upsert_syntax(connection):
+    """
+    Returns the native upsert syntax supported by the backend of 'connection':
+    'on_conflict' (SQLite >= 3.24, PostgreSQL >= 9.5), 'on_duplicate_key'
+    (MySQL) or None.
+    """
+    engine = connection.settings_dict['ENGINE']
+    if 'sqlite3' in engine or 'spatialite' in engine:
+        from django.db.backends.sqlite3.base import Database
+        if Database.sqlite_version_info >= (3, 24, 0):
+            return 'on_conflict'
+    elif 'postgresql' in engine or 'postgis' in engine:
+        if connection.ops.postgres_version[0:2] >= (9, 5):
+            return 'on_conflict'
+    elif 'mysql' in engine:
+        return 'on_duplicate_key'
+    return None
+
+
+class FieldTranslator(object):
     """
     Translates *shared* field names from '<shared_field>' to
     'master__<shared_field>' and caches those names.
+    
+    One instance is created per shared model (see
+    TranslateableModel.contribute_translations) and shared by all its managers
+    and querysets. Lookups are matched on their first component (the field
+    name before the first '__'), ordering names may start with '-'.
     """
-    def __init__(self, manager):
-        self.manager = manager
-        self.shared_fields = tuple(self.manager.shared_model._meta.get_all_field_names()) + ('pk',)
-        self.translated_fields  = tuple(self.manager.model._meta.get_all_field_names())
-        super(FieldTranslator, self).__init__()
+    def __init__(self, shared_model):
+        self.shared_model = shared_model
+        self._shared_fields = None
+        self._cache = {}
+    
+    @property
+    def shared_fields(self):
+        # Resolved on first use rather than on model creation, since reverse
+        # relations from models defined later are not known then.
+        if self._shared_fields is None:
+            names = self.shared_model._meta.get_all_field_names()
+            self._shared_fields = frozenset(names + ['pk'])
+        return self._shared_fields
+    
+    def is_shared(self, name):
+        return name in self.shared_fields
         
     def get(self, key):
-        if not key in self:
-            self[key] = self.build(key)
-        return self[key]
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._cache[key] = self.build(key)
+            return value
     
     def build(self, key):
-        if key.startswith(self.shared_fields):
-            return 'master__%s' % key
-        else:
-            return key
+        prefix = ''
+        name = key
+        if name.startswith('-'):
+            prefix, name = '-', name[1:]
+        if name.split(LOOKUP_SEP, 1)[0] in self.shared_fields:
+            return '%smaster__%s' % (prefix, name)
+        return key
 
 
 class ValuesMixin(object):
+    _row_factory = None
+    
     def _strip_master(self, key):
         if key.startswith('master__'):
             return key[8:]
         return key
+    
+    def _clone(self, klass=None, setup=False, **kwargs):
+        kwargs.setdefault('_row_factory', self._row_factory)
+        return super(ValuesMixin, self)._clone(klass, setup, **kwargs)
        
     def iterator(self):
-        for row in super(ValuesMixin, self).iterator():
-            if isinstance(row, dict):
-                yield dict([(self._strip_master(k), v) for k,v in row.items()])
-            else:
+        if self._row_factory is not None:
+            # translated_values
+            factory = self._row_factory
+            for row in super(ValuesMixin, self).iterator():
+                yield factory(row)
+        elif isinstance(self, ValuesListQuerySet):
+            for row in super(ValuesMixin, self).iterator():
                 yield row
+        else:
+            # Same as ValuesQuerySet.iterator, but with the 'master__' prefixes
+            # stripped from the names once, instead of once per row.
+            names = self.query.extra_select.keys() + self.field_names + \
+                self.query.aggregate_select.keys()
+            names = [self._strip_master(name) for name in names]
+            for row in self.query.get_compiler(self.db).results_iter():
+                yield dict(zip(names, row))
 
         
 class TranslationMixin(QuerySet):
@@ -57,11 +123,17 @@ class TranslationMixin(QuerySet):
         ValuesQuerySet: ValuesMixin,
     }
     
+    # Maximum number of ids sent to the database in a single 'IN' clause.
+    # Keeps large id lists below the parameter limits of the backends (SQLite
+    # allows 999 parameters per query).
+    batch_size = 500
+    
     def __init__(self, model=None, query=None, using=None, real=None):
-        self._local_field_names = None
-        self._field_translator = None
         self._real_manager = real
         self._language_code = None
+        self._language_fallbacks = None
+        self._language_filtered = False
+        self._translations_only = False
         super(TranslationMixin, self).__init__(model=model, query=query, using=using)
 
     #===========================================================================
@@ -85,17 +157,9 @@ class TranslationMixin(QuerySet):
     @property
     def field_translator(self):
         """
-        Field translator for this manager
+        Field translator of the shared model
         """
-        if self._field_translator is None:
-            self._field_translator = FieldTranslator(self)
-        return self._field_translator
-        
-    @property
-    def shared_local_field_names(self):
-        if self._local_field_names is None:
-            self._local_field_names = self.shared_model._meta.get_all_field_names()
-        return self._local_field_names
+        return self.shared_model._meta.field_translator
     
     def _translate_args_kwargs(self, *args, **kwargs):
         # Translated kwargs from '<shared_field>' to 'master__<shared_field>'
@@ -151,6 +215,288 @@ class TranslationMixin(QuerySet):
                 break
         return language_code
     
+    def _note_language_filter(self, args, kwargs):
+        """
+        Remember if the (translated) filter arguments 'args' and 'kwargs',
+        which were just applied to this queryset, filter by language_code, so
+        get and in_bulk don't have to inspect the where tree.
+        """
+        for key, value in kwargs.items():
+            if key.split(LOOKUP_SEP, 1)[0] != 'language_code':
+                continue
+            self._language_filtered = True
+            if key in ('language_code', 'language_code__exact'):
+                self._language_code = value
+        for arg in args:
+            if isinstance(arg, Q) and self._find_language_code(arg):
+                self._language_filtered = True
+    
+    def _get_cacheable_pk(self, kwargs):
+        """
+        Returns the primary key if 'kwargs' is a plain primary key lookup on a
+        queryset only filtered by (a single) language, otherwise None.
+        """
+        if len(kwargs) != 1 or self._language_fallbacks or self.query.extra:
+            return None
+        # annotations aren't cached
+        if self.query.aggregate_select:
+            return None
+        if not self._language_code:
+            return None
+        # the only filter is the one on the language
+        if len(self.query.where.children) != 1:
+            return None
+        key, value = kwargs.items()[0]
+        pk_name = self.shared_model._meta.pk.name
+        if key not in ('master__pk', 'master__%s' % pk_name,
+                       'master__pk__exact', 'master__%s__exact' % pk_name):
+            return None
+        return value
+    
+    def _get_cache_pairs(self):
+        """
+        Returns the (master pk, language_code) pairs of the translations in
+        this queryset, to invalidate them in the translation cache.
+        """
+        qs = super(TranslationMixin, self).values_list('master', 'language_code')
+        return [(master_id, code) for master_id, code in qs if master_id is not None]
+    
+    def _invalidate_cache(self, pairs, shared=False):
+        translation_cache.invalidate_translations(self.shared_model, pairs, self.db)
+        if shared:
+            pks = set([master_id for master_id, code in pairs])
+            translation_cache.invalidate_shared(self.shared_model, pks, self.db)
+    
+    def _can_fast_delete(self):
+        """
+        Checks if rows of the shared and translations model can be deleted
+        with raw DELETE queries, without cascading or sending signals.
+        """
+        shared_opts = self.shared_model._meta
+        trans_opts = self.model._meta
+        # rows of parent models would be left behind
+        if shared_opts.parents or trans_opts.parents:
+            return False
+        for related in shared_opts.get_all_related_objects():
+            if related.model is not self.model:
+                return False
+        if trans_opts.get_all_related_objects():
+            return False
+        for opts in (shared_opts, trans_opts):
+            if opts.many_to_many or opts.get_all_related_many_to_many_objects():
+                return False
+        # our own cache invalidation receivers are taken care of by delete
+        own = [self.shared_model.invalidate_translation_cache,
+               self.model.invalidate_translation_cache]
+        for model in (self.shared_model, self.model):
+            for signal in (pre_delete, post_delete):
+                for receiver in signal._live_receivers(_make_id(model)):
+                    if receiver not in own:
+                        return False
+        return True
+    
+    def _raw_delete(self, deletions, batch_size=None):
+        """
+        Execute the (model, field, values) deletions in order as
+        'DELETE FROM <model> WHERE <field> IN <values>' queries, in a single
+        transaction.
+        
+        'values' is either a subquery, sent as is, or a list of values, sent
+        'batch_size' values at a time.
+        """
+        commit_on_success(self.db, self._do_raw_delete, deletions,
+                           batch_size or self.batch_size)
+    
+    def _do_raw_delete(self, deletions, batch_size):
+        for model, field, values in deletions:
+            if isinstance(values, list):
+                batches = [values[offset:offset + batch_size]
+                           for offset in range(0, len(values), batch_size)]
+            else:
+                batches = [values]
+            query = sql.DeleteQuery(model)
+            for batch in batches:
+                where = query.where_class()
+                where.add((Constraint(None, field.column, field), 'in', batch), AND)
+                query.do_query(model._meta.db_table, where, using=self.db)
+    
+    def _can_delete_by_subquery(self, batch_size):
+        """
+        Checks if raw deletes can select the rows to delete with a subquery
+        instead of fetching their IDs first. Only done when no 'batch_size'
+        is given, and not on backends which can't select from the table they
+        delete from (MySQL).
+        """
+        return batch_size is None and connections[self.db].features.update_can_self_select
+    
+    def _bulk_create(self, objs, languages, batch_size):
+        using = self.db
+        # Shared rows. Without a primary key, they have to be inserted one by
+        # one to learn their ids.
+        self._bulk_insert(self.shared_model, [obj for obj in objs if obj.pk is not None], batch_size)
+        fields = [field for field in self.shared_model._meta.local_fields
+                  if not isinstance(field, AutoField)]
+        for obj in objs:
+            if obj.pk is None:
+                values = [(field, field.pre_save(obj, True)) for field in fields]
+                obj.pk = insert_query(self.shared_model, values, return_id=True, using=using)
+        # Translation rows
+        current = self._language_code or get_language()
+        translations = []
+        for index, obj in enumerate(objs):
+            if languages is None:
+                cache = getattr(obj, obj._meta.translations_languages_cache, None) or {}
+                for trans in cache.values():
+                    trans.master = obj
+                    translations.append(trans)
+                continue
+            for language_code, values in languages[index].items():
+                trans = self.model(language_code=language_code, **values)
+                trans.master = obj
+                cache_translation(obj, trans, activate=language_code == current)
+                translations.append(trans)
+        self._bulk_insert(self.model, translations, batch_size)
+        # Fetch the ids of the translations, so saving them later on updates
+        # the rows instead of inserting them again.
+        new = dict([((trans.master_id, trans.language_code), trans)
+                    for trans in translations if trans.pk is None])
+        master_ids = list(set([master_id for master_id, language_code in new.keys()]))
+        for offset in range(0, len(master_ids), batch_size):
+            qs = self.translations_manager.using(using).filter(
+                master__in=master_ids[offset:offset + batch_size]
+            ).values_list('pk', 'master', 'language_code')
+            for pk, master_id, language_code in qs:
+                if (master_id, language_code) in new:
+                    new[(master_id, language_code)].pk = pk
+        for trans in translations:
+            trans._state.db = using
+            trans._state.adding = False
+            trans.mark_clean()
+    
+    def _bulk_insert(self, model, objs, batch_size):
+        """
+        Insert the rows of 'objs' using one 'executemany' per 'batch_size'
+        objects. The primary key is only inserted if the objects have one.
+        """
+        if not objs:
+            return
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        fields = model._meta.local_fields
+        if objs[0].pk is None:
+            fields = [field for field in fields if not isinstance(field, AutoField)]
+        query = 'INSERT INTO %s (%s) VALUES (%s)' % (
+            qn(model._meta.db_table),
+            ', '.join([qn(field.column) for field in fields]),
+            ', '.join(['%s'] * len(fields)),
+        )
+        rows = []
+        for obj in objs:
+            rows.append([field.get_db_prep_save(field.pre_save(obj, True), connection=connection)
+                         for field in fields])
+        cursor = connection.cursor()
+        for offset in range(0, len(rows), batch_size):
+            cursor.executemany(query, rows[offset:offset + batch_size])
+    
+    def _upsert_translations(self, rows, batch_size):
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        fields = [field for field in opts.local_fields if not isinstance(field, AutoField)]
+        syntax = _upsert_syntax(connection)
+        # Rows updating the same fields are upserted together
+        groups = {}
+        order = []
+        for key, values in rows:
+            names = tuple(sorted(values.keys()))
+            if names not in groups:
+                groups[names] = []
+                order.append(names)
+            groups[names].append((key, values))
+        for names in order:
+            updated = [opts.get_field(name) for name in names]
+            objs = []
+            for (master_id, language_code), values in groups[names]:
+                objs.append(self.model(language_code=language_code, master_id=master_id, **values))
+            if syntax is None:
+                self._upsert_fallback(objs, updated, batch_size)
+                continue
+            query = 'INSERT INTO %s (%s) VALUES (%s)' % (
+                qn(opts.db_table),
+                ', '.join([qn(field.column) for field in fields]),
+                ', '.join(['%s'] * len(fields)),
+            )
+            if syntax == 'on_duplicate_key':
+                columns = [qn(field.column) for field in updated] or [qn('language_code')]
+                query += ' ON DUPLICATE KEY UPDATE %s' % ', '.join(
+                    ['%s = VALUES(%s)' % (column, column) for column in columns])
+            elif updated:
+                query += ' ON CONFLICT (%s, %s) DO UPDATE SET %s' % (
+                    qn('language_code'), qn(opts.get_field('master').column),
+                    ', '.join(['%s = excluded.%s' % (qn(field.column), qn(field.column))
+                               for field in updated]))
+            else:
+                query += ' ON CONFLICT DO NOTHING'
+            params = []
+            for obj in objs:
+                params.append([field.get_db_prep_save(field.pre_save(obj, True), connection=connection)
+                               for field in fields])
+            cursor = connection.cursor()
+            for offset in range(0, len(params), batch_size):
+                cursor.executemany(query, params[offset:offset + batch_size])
+    
+    def _upsert_fallback(self, objs, updated, batch_size):
+        """
+        Upsert for backends without native upsert: per batch, the primary keys
+        of the existing translations are selected in one query, then those are
+        updated with one 'executemany' and the others inserted with another.
+        """
+        connection = connections[self.db]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        query = 'UPDATE %s SET %s WHERE %s = %%s' % (
+            qn(opts.db_table),
+            ', '.join(['%s = %%s' % qn(field.column) for field in updated]),
+            qn(opts.pk.column),
+        )
+        for offset in range(0, len(objs), batch_size):
+            batch = objs[offset:offset + batch_size]
+            existing = {}
+            pairs = QuerySet(self.model, using=self.db).filter(
+                master__in=set([obj.master_id for obj in batch]),
+                language_code__in=set([obj.language_code for obj in batch]),
+            ).values_list('master', 'language_code', 'pk')
+            for master_id, language_code, pk in pairs:
+                existing[(master_id, language_code)] = pk
+            new = []
+            params = []
+            for obj in batch:
+                pk = existing.get((obj.master_id, obj.language_code))
+                if pk is None:
+                    new.append(obj)
+                elif updated:
+                    params.append([field.get_db_prep_save(field.pre_save(obj, False), connection=connection)
+                                   for field in updated] + [pk])
+            if params:
+                connection.cursor().executemany(query, params)
+            self._bulk_insert(self.model, new, batch_size)
+    
+    def _translate_aggregates(self, args, kwargs):
+        """
+        Turn positional aggregates into keyword ones (keeping the default alias
+        of the untranslated field name) and translate the field names they
+        refer to.
+        """
+        aggregates = {}
+        for arg in args:
+            aggregates[arg.default_alias] = arg
+        aggregates.update(kwargs)
+        for alias, aggregate in aggregates.items():
+            lookup = self.field_translator.get(aggregate.lookup)
+            if lookup != aggregate.lookup:
+                aggregates[alias] = aggregate.__class__(lookup, **aggregate.extra)
+        return aggregates
+    
     def _split_kwargs(self, **kwargs):
         """
         Split kwargs into shared and translated fields
@@ -158,7 +504,7 @@ class TranslationMixin(QuerySet):
         shared = {}
         translated = {}
         for key, value in kwargs.items():
-            if key in self.shared_local_field_names:
+            if self.field_translator.is_shared(key):
                 shared[key] = value
             else:
                 translated[key] = value
@@ -174,22 +520,132 @@ class TranslationMixin(QuerySet):
         qs = super(TranslationMixin, self)._clone()
         qs.__class__ = QuerySet
         # un-select-related the 'master' relation
-        del qs.query.select_related['master']
+        qs.query.select_related = False
         accessor = self.shared_model._meta.translations_accessor
         # update using the real manager
         return self._real_manager.filter(**{'%s__in' % accessor:qs})
     
+    def _combine(self, trans):
+        """
+        Combine 'trans' with its master, unless this is a translations only
+        queryset (see translations_only), in which case 'trans' is returned
+        as is. Annotations are copied onto the combined instance.
+        """
+        if self._translations_only:
+            return trans
+        combined = combine(trans)
+        for name in self.query.aggregate_select:
+            setattr(combined, name, getattr(trans, name))
+        return combined
+    
+    def _seek_keys(self):
+        """
+        Returns the ordering of this queryset as a list of (field name,
+        descending) tuples, with the primary key of the translations appended
+        as the tiebreaker.
+        
+        Orderings on foreign keys (eg 'master') are mapped to the primary key
+        of the related model, in SQL they would follow its Meta.ordering.
+        """
+        ordering = self.query.order_by
+        if not ordering and self.query.default_ordering:
+            ordering = self.model._meta.ordering
+        keys = []
+        for name in ordering:
+            assert isinstance(name, basestring) and name != '?' and '.' not in name, \
+                    "Cannot seek with random or extra orderings"
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            if name == self.model._meta.pk.name:
+                name = 'pk'
+            elif self._seek_field(name).rel:
+                name = '%s%spk' % (name, LOOKUP_SEP)
+            keys.append((name, descending))
+        if 'pk' not in [name for name, descending in keys]:
+            keys.append(('pk', False))
+        if not self.query.standard_ordering:
+            keys = [(name, not descending) for name, descending in keys]
+        return keys
+    
+    def _seek_field(self, name):
+        """
+        Returns the field the (translated) field name 'name' refers to.
+        """
+        opts = self.model._meta
+        field = None
+        for bit in name.split(LOOKUP_SEP):
+            if field is not None:
+                opts = field.rel.to._meta
+            if bit == 'pk':
+                field = opts.pk
+            else:
+                field = opts.get_field(bit)
+        return field
+    
+    def _seek_value(self, trans, name):
+        """
+        Get the value of the (translated) field name 'name' from the
+        translation 'trans' (following its master for shared fields).
+        """
+        bits = name.split(LOOKUP_SEP)
+        if len(bits) > 1 and bits[-1] == 'pk':
+            # the primary key of a related object is its foreign key value
+            bits = bits[:-1]
+        obj = trans
+        for bit in bits[:-1]:
+            obj = getattr(obj, bit)
+        if bits[-1] == 'pk':
+            return obj.pk
+        return getattr(obj, obj._meta.get_field(bits[-1]).attname)
+    
     #===========================================================================
     # Queryset/Manager API 
     #===========================================================================
     
-    def language(self, language_code=None):
-        if not language_code:
-            language_code = get_language()
-        self._language_code = language_code
-        return self.filter(language_code=language_code)
+    def translations_only(self):
+        """
+        Returns a queryset yielding the translations themselves instead of the
+        combined instances.
+        
+        The shared table is not joined, so only the translated fields (and
+        'language_code' and 'master_id') are fetched. The master is loaded
+        lazily (one query per instance) when accessing the 'master' attribute.
+        """
+        qs = self._clone()
+        qs._translations_only = True
+        qs.query.select_related = False
+        return qs
+    
+    def language(self, language_code=None, fallbacks=None):
+        """
+        Filter by language.
+        
+        'language_code' may also be a list of language codes, in which case
+        the first one is the preferred language and the others are fallbacks
+        tried in order (the same as passing them as 'fallbacks'). All candidate
+        translations are fetched in a single query and the best one per master
+        is picked when iterating.
+        """
+        if isinstance(language_code, (list, tuple)):
+            languages = list(language_code)
+        else:
+            languages = [language_code or get_language()]
+        if fallbacks:
+            languages.extend([code for code in fallbacks if code not in languages])
+        if len(languages) == 1:
+            qs = self.filter(language_code=languages[0])
+            qs._language_fallbacks = None
+        else:
+            qs = self.filter(language_code__in=languages)
+            qs._language_fallbacks = languages
+        qs._language_code = languages[0]
+        return qs
         
     def create(self, **kwargs):
+        """
+        Create and save a shared instance and its translation (in a single
+        transaction, see TranslateableModel.save).
+        """
         if 'language_code' not in kwargs:
             if self._language_code:
                 kwargs['language_code'] = self._language_code
@@ -200,6 +656,72 @@ class TranslationMixin(QuerySet):
         obj.save(force_insert=True, using=self.db)
         return obj
     
+    def bulk_create(self, objs, languages=None, batch_size=None):
+        """
+        Insert the shared instances 'objs' and their translations, 'batch_size'
+        rows per query, in a single transaction.
+        
+        The translations inserted are either the ones cached on the instances
+        (eg by TranslateableModel.__init__) or, if 'languages' is given, the
+        ones described by it: a list with one dictionary per object, mapping
+        language codes to dictionaries of translated field values.
+        
+        Shared instances without a primary key are inserted one by one, since
+        the ids of rows inserted together cannot be retrieved. save() is not
+        called and no signals are sent.
+        """
+        objs = list(objs)
+        if self.shared_model._meta.parents:
+            raise ValueError("Can't bulk create an inherited model")
+        if languages is not None and len(languages) != len(objs):
+            raise ValueError("'languages' must have one entry per object")
+        if not objs:
+            return objs
+        self._for_write = True
+        commit_on_success(self.db, self._bulk_create, objs, languages,
+                           batch_size or self.batch_size)
+        return objs
+    bulk_create.alters_data = True
+    
+    def upsert_translations(self, rows, batch_size=None):
+        """
+        Insert or update translations without loading them, relying on the
+        unique constraint on (language_code, master) of the translations model.
+        
+        'rows' is an iterable of (master, language_code, values) tuples, where
+        master is a shared instance or primary key and values a dictionary of
+        translated field values. Existing translations only get the fields in
+        'values' updated, new ones get the defaults for the other fields. If a
+        translation is given more than once, the values are merged (the later
+        ones win).
+        
+        Uses INSERT ... ON CONFLICT (SQLite, PostgreSQL) or INSERT ... ON
+        DUPLICATE KEY UPDATE (MySQL), 'batch_size' rows per query, otherwise
+        falls back to selecting the existing translations and updating or
+        inserting them in batches. Everything happens in a single transaction,
+        save() is not called and no signals are sent.
+        
+        Returns the number of translations upserted.
+        """
+        merged = {}
+        order = []
+        for master, language_code, values in rows:
+            key = (getattr(master, 'pk', master), language_code)
+            if key not in merged:
+                merged[key] = {}
+                order.append(key)
+            merged[key].update(values)
+        if not order:
+            return 0
+        self._for_write = True
+        commit_on_success(self.db, self._upsert_translations,
+                           [(key, merged[key]) for key in order],
+                           batch_size or self.batch_size)
+        if translation_cache.enabled:
+            self._invalidate_cache(order)
+        return len(order)
+    upsert_translations.alters_data = True
+    
     def get(self, *args, **kwargs):
         """
         Get an object by querying the translations model and returning a 
@@ -209,58 +731,143 @@ class TranslationMixin(QuerySet):
         newargs, newkwargs = self._translate_args_kwargs(*args, **kwargs)
         # Enforce 'select related' onto 'master'
         # Get the translated instance
-        found = False
         qs = self
         if 'language_code' in newkwargs:
             language_code = newkwargs.pop('language_code')
             qs = self.language(language_code)
-        elif args:
+        elif not self._language_filtered:
             language_code = None
-            for arg in args:
+            for arg in newargs:
                 if not isinstance(arg, Q):
                     continue
                 language_code = self._find_language_code(arg)
                 if language_code:
                     break
-            if language_code:
-                qs = self.language(language_code)
-            else:
-                qs = self.language()
-        else:
-            for where in qs.query.where.children:
-                if where.children:
-                    for child in where.children:
-                        if child[0].field.name == 'language_code':
-                            found = True
-                            break
-                if found:
-                    break
-            if not found:
-                qs = self.language()
+            qs = self.language(language_code)
+        pk = None
+        if translation_cache.enabled and not newargs and not qs._translations_only:
+            pk = qs._get_cacheable_pk(newkwargs)
+        if pk is not None:
+            trans = translation_cache.get_combined(self.shared_model, pk, qs._language_code, qs.db)
+            if trans is not None:
+                return combine(trans)
         # self.iterator already combines! Isn't that nice?
-        return QuerySet.get(qs, *newargs, **newkwargs)
+        obj = QuerySet.get(qs, *newargs, **newkwargs)
+        if pk is not None:
+            translation_cache.set_combined(obj, getattr(obj, obj._meta.translations_cache))
+        return obj
 
     def filter(self, *args, **kwargs):
         newargs, newkwargs = self._translate_args_kwargs(*args, **kwargs)
-        return super(TranslationMixin, self).filter(*newargs, **newkwargs)
+        qs = super(TranslationMixin, self).filter(*newargs, **newkwargs)
+        qs._note_language_filter(newargs, newkwargs)
+        return qs
+
+    def count(self):
+        if self._language_fallbacks:
+            # count masters, not candidate translations
+            qs = self._clone()
+            qs._language_fallbacks = None
+            return QuerySet.values(qs, 'master').distinct().count()
+        return super(TranslationMixin, self).count()
 
     def aggregate(self, *args, **kwargs):
-        raise NotImplementedError()
+        """
+        Aggregate over shared and translated fields in a single query (over
+        the best translation of each master with language fallbacks).
+        """
+        aggregates = self._translate_aggregates(args, kwargs)
+        qs = self
+        if self._language_fallbacks:
+            qs = self._best_candidates()
+        return super(TranslationMixin, qs).aggregate(**aggregates)
 
     def latest(self, field_name=None):
         if field_name:
             field_name = self.field_translator.get(field_name)
         return super(TranslationMixin, self).latest(field_name)
 
-    def in_bulk(self, id_list):
-        raise NotImplementedError()
+    def in_bulk(self, id_list, language_code=None):
+        """
+        Returns a dictionary mapping each of the given (shared) IDs to the
+        combined instance with that ID (or to its translation if this is a
+        translations only queryset).
+        
+        The translations are fetched together with their master in a single
+        query (one per 'batch_size' IDs).
+        """
+        assert self.query.can_filter(), \
+                "Cannot use 'limit' or 'offset' with in_bulk"
+        assert isinstance(id_list, (tuple,  list, set, frozenset)), \
+                "in_bulk() must be provided with a list of IDs."
+        if not id_list:
+            return {}
+        if language_code:
+            qs = self.language(language_code)
+        elif not self._language_filtered:
+            qs = self.language()
+        else:
+            qs = self._clone()
+        qs.query.clear_ordering(force_empty=True)
+        id_list = list(id_list)
+        batch_size = self.batch_size
+        result = {}
+        for offset in range(0, len(id_list), batch_size):
+            batch = id_list[offset:offset + batch_size]
+            batch_qs = qs._clone()
+            batch_qs.query.add_filter(('master__pk__in', batch))
+            for obj in batch_qs.iterator():
+                if qs._translations_only:
+                    result[obj.master_id] = obj
+                else:
+                    result[obj.pk] = obj
+        return result
 
-    def delete(self):
-        qs = self._get_shared_query_set()
-        qs.delete()
+    def delete(self, batch_size=None):
+        """
+        Delete the shared instances (and all their translations) of the
+        translations in this queryset.
+        
+        If nothing else relates to the shared or translations model and no
+        receivers are connected to their delete signals, this is done by
+        selecting the IDs of the masters once and then deleting their
+        translations and shared rows with raw DELETE queries ('batch_size' IDs
+        at a time) in a single transaction, instead of going through Django's
+        object collector.
+        """
+        if translation_cache.enabled:
+            pairs = self._get_cache_pairs()
+        if self._can_fast_delete():
+            master_ids = list(super(TranslationMixin, self).values_list('master', flat=True).distinct())
+            master_ids = [master_id for master_id in master_ids if master_id is not None]
+            master_field = self.model._meta.get_field('master')
+            self._raw_delete([
+                (self.model, master_field, master_ids),
+                (self.shared_model, self.shared_model._meta.pk, master_ids),
+            ], batch_size)
+        else:
+            qs = self._get_shared_query_set()
+            qs.delete()
+        if translation_cache.enabled:
+            self._invalidate_cache(pairs, shared=True)
     delete.alters_data = True
     
-    def delete_translations(self):
+    def delete_translations(self, batch_size=None):
+        """
+        Delete the translations in this queryset, but not their shared
+        instances. Uses raw DELETE queries under the same conditions as delete.
+        """
+        if self._can_fast_delete():
+            if translation_cache.enabled:
+                pairs = self._get_cache_pairs()
+            ids = super(TranslationMixin, self).values_list('pk', flat=True)
+            if not self._can_delete_by_subquery(batch_size):
+                ids = list(ids)
+            self._raw_delete([(self.model, self.model._meta.pk, ids)], batch_size)
+            if translation_cache.enabled:
+                self._invalidate_cache(pairs)
+            return
+        # update invalidates the translation cache
         self.update(master=None)
         super(TranslationMixin, self).delete()
     delete_translations.alters_data = True
@@ -268,12 +875,16 @@ class TranslationMixin(QuerySet):
 
     def update(self, **kwargs):
         shared, translated = self._split_kwargs(**kwargs)
+        if translation_cache.enabled:
+            pairs = self._get_cache_pairs()
         count = 0
         if translated:
             count += super(TranslationMixin, self).update(**translated)
         if shared:
             shared_qs = self._get_shared_query_set()
             count += shared_qs.update(**shared)
+        if translation_cache.enabled:
+            self._invalidate_cache(pairs, shared=bool(shared))
         return count
     update.alters_data = True
 
@@ -285,17 +896,93 @@ class TranslationMixin(QuerySet):
         fields = self._translate_fieldnames(fields)
         return super(TranslationMixin, self).values_list(*fields, **kwargs)
 
+    def translated_values(self, *fields, **kwargs):
+        """
+        Returns a values queryset yielding the given shared and translated
+        fields (by default all of them) of each translation, without creating
+        model instances.
+        
+        'row_type' selects the type of the rows: 'dict' (default), 'tuple' or
+        'namedtuple'. The mapping from columns to names is computed once per
+        queryset.
+        
+        With language fallbacks, only the best translation of each master is
+        yielded.
+        """
+        row_type = kwargs.pop('row_type', 'dict')
+        if kwargs:
+            raise TypeError('Unexpected keyword arguments to translated_values: %s'
+                    % (kwargs.keys(),))
+        if not fields:
+            fields = [field.name for field in self.shared_model._meta.fields]
+            for field in self.model._meta.fields:
+                if field.name not in ('master', self.model._meta.pk.name):
+                    fields.append(field.name)
+        names = list(fields)
+        if row_type == 'dict':
+            factory = lambda row: dict(zip(names, row))
+        elif row_type == 'tuple':
+            factory = tuple
+        elif row_type == 'namedtuple':
+            from collections import namedtuple
+            factory = namedtuple('%sValues' % self.shared_model.__name__, names)._make
+        else:
+            raise ValueError("'row_type' must be 'dict', 'tuple' or 'namedtuple'")
+        source = self
+        if self._language_fallbacks:
+            source = self._best_candidates()
+        qs = super(TranslationMixin, source).values_list(*self._translate_fieldnames(fields))
+        qs._row_factory = factory
+        return qs
+
     def dates(self, field_name, kind, order='ASC'):
-        raise NotImplementedError()
+        """
+        Returns a list of the distinct dates of 'field_name' (shared or
+        translated), truncated to 'kind', of the instances in this queryset.
+        
+        Dates of translated fields are those of the translations matched by
+        this queryset (so filter by language first for per language dates),
+        dates of shared fields are selected from the shared table with the
+        translations as a subquery. Either way this is a single query.
+        """
+        if self.field_translator.is_shared(field_name):
+            qs = self._get_shared_query_set()
+            return qs.dates(field_name, kind, order)
+        return super(TranslationMixin, self).dates(field_name, kind, order)
+    
+    def datetimes(self, field_name, kind, order='ASC'):
+        """
+        Same as dates. Dates of DateTimeFields are returned as (truncated)
+        datetime objects.
+        """
+        return self.dates(field_name, kind, order)
 
     def exclude(self, *args, **kwargs):
-        raise NotImplementedError()
+        newargs, newkwargs = self._translate_args_kwargs(*args, **kwargs)
+        return super(TranslationMixin, self).exclude(*newargs, **newkwargs)
 
     def complex_filter(self, filter_obj):
-        raise NotImplementedError()
+        # Q objects and dictionaries get translated, R objects or other objects
+        # with an 'add_to_query' method are used as they are.
+        if isinstance(filter_obj, R) or (not isinstance(filter_obj, Q)
+                and hasattr(filter_obj, 'add_to_query')):
+            return super(TranslationMixin, self).complex_filter(filter_obj)
+        if isinstance(filter_obj, Q):
+            newargs, newkwargs = self._translate_args_kwargs(filter_obj)
+            qs = super(TranslationMixin, self).complex_filter(newargs[0])
+        else:
+            newargs, newkwargs = self._translate_args_kwargs(**filter_obj)
+            qs = super(TranslationMixin, self).complex_filter(newkwargs)
+        qs._note_language_filter(newargs, newkwargs)
+        return qs
 
     def annotate(self, *args, **kwargs):
-        raise NotImplementedError()
+        """
+        Annotate with aggregates over shared and translated fields. The
+        annotations are set on the combined instances.
+        """
+        aggregates = self._translate_aggregates(args, kwargs)
+        return super(TranslationMixin, self).annotate(**aggregates)
 
     def order_by(self, *field_names):
         """
@@ -305,20 +992,43 @@ class TranslationMixin(QuerySet):
         return super(TranslationMixin, self).order_by(*fieldnames)
     
     def reverse(self):
-        raise NotImplementedError()
+        """
+        Reverses the ordering of the queryset. Orderings on shared fields are
+        already translated to 'master__<field>', so this is just the ordering
+        of the translations queryset reversed.
+        """
+        return super(TranslationMixin, self).reverse()
 
     def defer(self, *fields):
-        raise NotImplementedError()
+        """
+        Defer loading of the given shared and translated fields. Deferred
+        translated fields get loaded together, in one query per instance, when
+        one of them is accessed.
+        
+        'language_code' and 'master' are needed to combine the instances, so
+        they are never deferred.
+        """
+        fieldnames = [name for name in self._translate_fieldnames(fields)
+                      if name not in ('language_code', 'master')]
+        return super(TranslationMixin, self).defer(*fieldnames)
 
     def only(self, *fields):
-        raise NotImplementedError()
+        """
+        Only load the given shared and translated fields (and the fields
+        needed to combine the instances), see defer.
+        """
+        fieldnames = self._translate_fieldnames(fields)
+        if fields:
+            fieldnames.extend(['language_code', 'master'])
+        return super(TranslationMixin, self).only(*fieldnames)
     
     def _clone(self, klass=None, setup=False, **kwargs):
         kwargs.update({
-            '_local_field_names': self._local_field_names,
-            '_field_translator': self._field_translator,
             '_language_code': self._language_code,
+            '_language_fallbacks': self._language_fallbacks,
+            '_language_filtered': self._language_filtered,
             '_real_manager': self._real_manager,
+            '_translations_only': self._translations_only,
         })
         if klass:
             klass = self._get_class(klass)
@@ -327,15 +1037,310 @@ class TranslationMixin(QuerySet):
         return super(TranslationMixin, self)._clone(klass, setup, **kwargs)
     
     def __getitem__(self, item):
+        if self._language_fallbacks and self._result_cache is None:
+            # limits on the query would apply to the candidate translations,
+            # so only select the best candidate of each master and slice that.
+            return super(TranslationMixin, self._best_candidates()).__getitem__(item)
         return super(TranslationMixin, self).__getitem__(item)
     
+    def _best_candidates(self):
+        """
+        Returns a clone of this (language fallbacks) queryset without language
+        fallbacks, only matching the best candidate translation of each
+        master, so it can be limited, ordered and aggregated in SQL.
+        
+        Excludes the candidates of a language for which this queryset also
+        matches a translation of the same master in a language earlier in
+        self._language_fallbacks (selected by a subquery built from this
+        queryset, so its filters apply to the better candidates as well).
+        """
+        languages = self._language_fallbacks
+        worse = None
+        for index in range(1, len(languages)):
+            better = self._clone()
+            better._language_fallbacks = None
+            better = QuerySet.filter(better, language_code__in=languages[:index],
+                                     master__isnull=False)
+            better = QuerySet.values_list(better, 'master', flat=True)
+            condition = R(language_code=languages[index], master__in=better)
+            if worse is None:
+                worse = condition
+            else:
+                worse |= condition
+        qs = self._ordered_by_master()
+        qs._language_fallbacks = None
+        if worse is None:
+            return qs
+        return QuerySet.exclude(qs, worse)
+    
     def iterator(self):
+        if self._language_fallbacks:
+            for obj in self._fallback_iterator():
+                yield obj
+            return
         for obj in super(TranslationMixin, self).iterator():
             # non-cascade-deletion hack:
-            if not obj.master:
+            if not obj.master_id:
                 yield obj
             else:
-                yield combine(obj)
+                yield self._combine(obj)
+    
+    def _ordered_by_master(self):
+        """
+        Returns a clone of this queryset, ordered by master if it isn't
+        ordered otherwise, so language fallbacks querysets yield the masters
+        in a stable order.
+        """
+        if self.ordered:
+            return self._clone()
+        return QuerySet.order_by(self, 'master__pk')
+    
+    def _fallback_iterator(self, rows=None):
+        """
+        Yields the combined instance of the best matching translation (by
+        position in self._language_fallbacks) for each master, in the order
+        of those best translations in the rows (so orderings on translated
+        fields apply to the translations picked). The other candidate
+        translations are put into the per-language translations cache of the
+        combined instance. Unordered querysets yield the masters by primary
+        key.
+        For translations only querysets the best translation itself is yielded
+        and the other candidates are dropped.
+        
+        Uses the translations in 'rows' if given instead of evaluating this
+        queryset.
+        """
+        if rows is None:
+            rows = super(TranslationMixin, self._ordered_by_master()).iterator()
+        rank = dict([(code, index) for index, code in enumerate(self._language_fallbacks)])
+        positions = {}
+        candidates = {}
+        for position, obj in enumerate(rows):
+            if not obj.master_id:
+                continue
+            positions[obj.pk] = position
+            candidates.setdefault(obj.master_id, []).append(obj)
+        for translations in candidates.values():
+            translations.sort(key=lambda trans: rank[trans.language_code])
+        best = [translations[0] for translations in candidates.values()]
+        best.sort(key=lambda trans: positions[trans.pk])
+        for preferred in best:
+            translations = candidates[preferred.master_id]
+            combined = self._combine(preferred)
+            if self._translations_only:
+                yield combined
+                continue
+            for trans in translations[1:]:
+                cache_translation(combined, trans, activate=False)
+            yield combined
+    
+    def stream(self, chunk_size=None):
+        """
+        Yields the combined instances of this queryset, fetching them
+        'chunk_size' at a time, so only one chunk is held in memory.
+        
+        Chunks are fetched with keyset pagination ordered by the primary key of
+        the translations (or by the primary key of their master if language
+        fallbacks are used), so every chunk costs the same, and the ordering
+        of the queryset is ignored. Nothing is put in the result cache.
+        """
+        assert self.query.can_filter(), \
+                "Cannot use 'limit' or 'offset' with stream"
+        chunk_size = chunk_size or self.batch_size
+        if self._language_fallbacks:
+            # a master has at most one candidate per language, so a full chunk
+            # always contains at least one complete master.
+            chunk_size = max(chunk_size, len(self._language_fallbacks) + 1)
+            # not 'master', which would follow the ordering of the shared model
+            key = 'master__pk'
+        else:
+            key = 'pk'
+        qs = QuerySet.order_by(self._clone(), key)
+        if self._language_fallbacks:
+            qs.query.add_filter(('master__isnull', False))
+        last = None
+        while True:
+            chunk_qs = qs._clone()
+            if last is not None:
+                chunk_qs.query.add_filter(('%s__gt' % key, last))
+            chunk_qs.query.set_limits(0, chunk_size)
+            rows = list(QuerySet.iterator(chunk_qs))
+            complete = len(rows) < chunk_size
+            if not self._language_fallbacks:
+                for obj in rows:
+                    # non-cascade-deletion hack:
+                    if not obj.master_id:
+                        yield obj
+                    else:
+                        yield self._combine(obj)
+                if complete:
+                    return
+                last = rows[-1].pk
+                continue
+            if not complete:
+                # the candidates of the last master might be in the next chunk
+                incomplete = rows[-1].master_id
+                rows = [obj for obj in rows if obj.master_id != incomplete]
+            for obj in self._fallback_iterator(rows):
+                yield obj
+            if complete:
+                return
+            last = rows[-1].master_id
+
+
+    def seek(self, after=None, limit=None):
+        """
+        Keyset pagination: returns a tuple of the list of the (at most 'limit',
+        defaults to 'batch_size') combined instances following the cursor
+        'after' in the ordering of this queryset, and the cursor of the next
+        page (None on the last page). Start with after=None.
+        
+        Instead of an OFFSET every page filters on the values of the ordering
+        fields (shared or translated) of the last row of the previous page,
+        with the primary key of the translations as the tiebreaker, so every
+        page costs the same single query. Cursors are tuples of those values,
+        serialize them as you see fit. The ordering fields should not be
+        nullable.
+        """
+        assert self.query.can_filter(), \
+                "Cannot use 'limit' or 'offset' with seek"
+        assert not self._language_fallbacks, \
+                "Cannot seek with language fallbacks"
+        limit = limit or self.batch_size
+        keys = self._seek_keys()
+        qs = self._clone()
+        if after is not None:
+            after = tuple(after)
+            assert len(after) == len(keys), \
+                    "The cursor does not match the ordering of the queryset"
+            q = Q()
+            for index, (name, descending) in enumerate(keys):
+                condition = dict([(keys[i][0], after[i]) for i in range(index)])
+                if descending:
+                    condition['%s__lt' % name] = after[index]
+                else:
+                    condition['%s__gt' % name] = after[index]
+                q |= Q(**condition)
+            qs.query.add_q(q)
+        qs.query.clear_ordering(force_empty=True)
+        qs.query.standard_ordering = True
+        ordering = []
+        for name, descending in keys:
+            if descending:
+                ordering.append('-%s' % name)
+            else:
+                ordering.append(name)
+        qs.query.add_ordering(*ordering)
+        qs.query.set_limits(0, limit)
+        rows = list(QuerySet.iterator(qs))
+        objs = []
+        for obj in rows:
+            # non-cascade-deletion hack:
+            if not obj.master_id:
+                objs.append(obj)
+            else:
+                objs.append(self._combine(obj))
+        if len(rows) < limit:
+            return objs, None
+        cursor = tuple([self._seek_value(rows[-1], name) for name, descending in keys])
+        return objs, cursor
+
+
+class SharedQuerySet(QuerySet):
+    """
+    Queryset for the *untranslated* real manager of translated models
+    (eg 'Normal._objects').
+    """
+    def __init__(self, *args, **kwargs):
+        self._prefetch_languages = None
+        super(SharedQuerySet, self).__init__(*args, **kwargs)
+    
+    def prefetch_translations(self, *languages):
+        """
+        Load the translations of all instances in this queryset in one
+        additional query when it gets evaluated, instead of one query per
+        instance when accessing a translated attribute.
+        
+        All given languages are put into the per-language translations cache
+        of the instances and the first one available becomes the current
+        translation. Defaults to the current language.
+        """
+        qs = self._clone()
+        qs._prefetch_languages = list(languages) or [get_language()]
+        return qs
+    
+    def untranslated(self, *languages):
+        """
+        Shared instances with no translation in any of the given languages, or
+        with no translations at all if no languages are given.
+        
+        Uses an anti-join on the translations, so the result can be used as a
+        subquery (for example in a '__in' lookup) too.
+        """
+        accessor = self.model._meta.translations_accessor
+        if languages:
+            return self.exclude(**{'%s__language_code__in' % accessor: languages})
+        return self.filter(**{'%s__isnull' % accessor: True})
+    
+    def missing_language(self, language_code=None):
+        """
+        Shared instances not translated to 'language_code' (defaults to the
+        current language).
+        """
+        return self.untranslated(language_code or get_language())
+    
+    def _clone(self, klass=None, setup=False, **kwargs):
+        kwargs['_prefetch_languages'] = self._prefetch_languages
+        return super(SharedQuerySet, self)._clone(klass, setup, **kwargs)
+    
+    def iterator(self):
+        if not self._prefetch_languages:
+            for obj in super(SharedQuerySet, self).iterator():
+                yield obj
+            return
+        instances = list(super(SharedQuerySet, self).iterator())
+        if instances:
+            self._seed_translations(instances)
+        for obj in instances:
+            yield obj
+    
+    def _seed_translations(self, instances):
+        opts = self.model._meta
+        rank = dict([(code, index) for index, code in enumerate(self._prefetch_languages)])
+        manager = opts.translations_model.objects
+        pks = [obj.pk for obj in instances]
+        # one query per 'batch_size' masters, like TranslationMixin.in_bulk
+        batch_size = TranslationMixin.batch_size
+        by_master = {}
+        for offset in range(0, len(pks), batch_size):
+            translations = manager.using(self.db).filter(
+                master__in=pks[offset:offset + batch_size],
+                language_code__in=self._prefetch_languages,
+            )
+            for trans in translations:
+                by_master.setdefault(trans.master_id, []).append(trans)
+        for obj in instances:
+            candidates = by_master.get(obj.pk, [])
+            candidates.sort(key=lambda trans: rank[trans.language_code])
+            for index, trans in enumerate(candidates):
+                cache_translation(obj, trans, activate=index == 0)
+
+
+class SharedManager(models.Manager):
+    """
+    Real (untranslated) manager for models with translated fields.
+    """
+    def get_query_set(self):
+        return SharedQuerySet(self.model, using=self._db)
+    
+    def prefetch_translations(self, *languages):
+        return self.get_query_set().prefetch_translations(*languages)
+    
+    def untranslated(self, *languages):
+        return self.get_query_set().untranslated(*languages)
+    
+    def missing_language(self, language_code=None):
+        return self.get_query_set().missing_language(language_code)
 
 
 class TranslationManager(models.Manager):
@@ -345,8 +1350,65 @@ class TranslationManager(models.Manager):
     #===========================================================================
     # API 
     #===========================================================================
-    def language(self, language_code=None):
-        return self.get_query_set().language(language_code)
+    def language(self, language_code=None, fallbacks=None):
+        return self.get_query_set().language(language_code, fallbacks)
+    
+    def bulk_create(self, objs, languages=None, batch_size=None):
+        return self.get_query_set().bulk_create(objs, languages, batch_size)
+    
+    def upsert_translations(self, rows, batch_size=None):
+        return self.get_query_set().upsert_translations(rows, batch_size)
+    
+    def translations_only(self):
+        return self.get_query_set().translations_only()
+    
+    def datetimes(self, field_name, kind, order='ASC'):
+        return self.get_query_set().datetimes(field_name, kind, order)
+    
+    def untranslated(self, *languages):
+        """
+        Returns a queryset of the shared instances (from the real manager)
+        with no translation in any of the given languages, or with no
+        translations at all if no languages are given.
+        """
+        return self._get_real_query_set().untranslated(*languages)
+    
+    def missing_language(self, language_code=None):
+        """
+        Returns a queryset of the shared instances (from the real manager) not
+        translated to 'language_code' (defaults to the current language).
+        """
+        return self._get_real_query_set().missing_language(language_code)
+    
+    def translation_coverage(self, languages=None):
+        """
+        Returns a dictionary mapping each of 'languages' (defaults to the
+        languages in settings.LANGUAGES) to a dictionary with:
+        
+            'count': the number of shared instances translated to it.
+            'missing_count': the number of shared instances not translated to it.
+            'missing': a (lazy) queryset of those shared instances.
+        
+        The counts are computed with one grouped query over the translations
+        table and one count of the shared table.
+        """
+        if languages is None:
+            languages = [code for code, name in settings.LANGUAGES]
+        total = self._get_real_query_set().count()
+        counts = dict([(code, 0) for code in languages])
+        rows = self.translations_model.objects.using(self.db).filter(
+            language_code__in=languages, master__isnull=False,
+        ).values('language_code').annotate(count=Count('master')).order_by()
+        for row in rows:
+            counts[row['language_code']] = row['count']
+        coverage = {}
+        for code in languages:
+            coverage[code] = {
+                'count': counts[code],
+                'missing_count': total - counts[code],
+                'missing': self.missing_language(code),
+            }
+        return coverage
     
     #===========================================================================
     # Internals
@@ -359,6 +1421,11 @@ class TranslationManager(models.Manager):
         """
         return self.model._meta.translations_model
 
+    def _get_real_query_set(self):
+        if not hasattr(self, '_real_manager'):
+            self.contribute_real_manager()
+        return self._real_manager.using(self.db)
+    
     def get_query_set(self):
         """
         Make sure that querysets inherit the methods on this manager (chaining)
@@ -374,5 +1441,5 @@ class TranslationManager(models.Manager):
         self.contribute_real_manager()
         
     def contribute_real_manager(self):
-        self._real_manager = models.Manager()
+        self._real_manager = SharedManager()
         self._real_manager.contribute_to_class(self.model, '_%s' % getattr(self, 'name', 'objects'))
\ No newline at end of file
@@ -1,10 +1,12 @@
 from django.core.exceptions import ImproperlyConfigured
-from django.db import models
+from django.db import DEFAULT_DB_ALIAS, models, router
 from django.db.models.base import ModelBase
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.utils.translation import get_language
 from nani.descriptors import LanguageCodeAttribute, TranslatedAttribute
-from nani.manager import TranslationManager
+from nani.cache import translation_cache
+from nani.manager import FieldTranslator, TranslationManager
+from nani.utils import cache_translation, commit_on_success
 
 def create_translations_model(model, related_name, meta, **fields):
     """
@@ -22,9 +24,16 @@ def create_translations_model(model, related_name, meta, **fields):
         
     Those two fields are unique together, this get's enforced in the inner Meta
     class of the translations table
+    
+    'meta' may also contain 'index_together', a list of tuples of field names
+    of the translations model (eg ('language_code', 'title')) to create
+    composite indexes for when the table is created by syncdb. Use it for the
+    fields you order language filtered querysets by.
     """
     if not meta:
         meta = {}
+    meta = dict(meta)
+    index_together = [tuple(names) for names in meta.pop('index_together', [])]
     unique = [('language_code', 'master')]
     meta['unique_together'] = list(meta.get('unique_together', [])) + unique
     # Create inner Meta class 
@@ -38,7 +47,11 @@ def create_translations_model(model, related_name, meta, **fields):
     # null=True is so we can prevent cascade deletion
     attrs['master'] = models.ForeignKey(model, related_name=related_name, editable=False, null=True)
     # Create and return the new model
-    return ModelBase(name, (BaseTranslationModel,), attrs)
+    new_model = ModelBase(name, (BaseTranslationModel,), attrs)
+    new_model._meta.index_together = index_together
+    post_save.connect(new_model.invalidate_translation_cache, sender=new_model, weak=False)
+    post_delete.connect(new_model.invalidate_translation_cache, sender=new_model, weak=False)
+    return new_model
 
 
 class TranslatedFields(object):
@@ -60,11 +73,103 @@ class BaseTranslationModel(models.Model):
     """
     Needed for detection of translation models. Due to the way dynamic classes
     are created, we cannot put the 'language_code' field on here.
+    
+    Keeps the values of its fields as they are in the database (as far as it
+    knows) and the names of the fields set through the shared instance, to
+    tell which fields changed since it was loaded or saved.
     """
     def __init__(self, *args, **kwargs):
         super(BaseTranslationModel, self).__init__(*args, **kwargs)
+        self.mark_clean()
     class Meta:
         abstract = True
+    
+    def mark_clean(self):
+        """
+        Remember the current values of the (loaded) fields as the ones in the
+        database.
+        """
+        self._saved_values = dict([(field.attname, self.__dict__[field.attname])
+                                   for field in self._meta.fields
+                                   if field.attname in self.__dict__])
+        self._changed_fields = set()
+    
+    def get_dirty_fields(self):
+        """
+        Returns the names of the fields changed since this translation was
+        loaded or saved (all of them if it is not in the database yet).
+        Deferred fields which are not loaded are never dirty.
+        """
+        if self._state.adding:
+            return [field.name for field in self._meta.fields]
+        dirty = []
+        for field in self._meta.fields:
+            if field.name in self._changed_fields:
+                # set through the shared instance (TranslatedAttribute)
+                dirty.append(field.name)
+            elif field.attname not in self.__dict__:
+                continue
+            elif field.attname not in self._saved_values:
+                # loaded later, we can't tell
+                dirty.append(field.name)
+            elif self._saved_values[field.attname] != self.__dict__[field.attname]:
+                dirty.append(field.name)
+        return dirty
+    
+    def save(self, force_insert=False, force_update=False, using=None, update_fields=None):
+        """
+        Translations loaded from the database are updated without checking if
+        their row exists first (and inserted again if the update finds no
+        row).
+        
+        If 'update_fields' (a list of field names) is given for a translation
+        loaded from the database, only those columns are written, with a
+        single UPDATE query (like update_fields of later Django versions).
+        """
+        if not (force_insert or force_update) and not self._state.adding and self.pk is not None:
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.fields
+                                 if not field.primary_key]
+            self._save_fields(update_fields, using)
+            return
+        super(BaseTranslationModel, self).save(force_insert, force_update, using)
+        self.mark_clean()
+    save.alters_data = True
+    
+    def _save_fields(self, names, using):
+        if not names:
+            return
+        using = using or router.db_for_write(self.__class__, instance=self)
+        cls = self.__class__
+        if self._deferred:
+            cls = self._meta.proxy_for_model
+        pre_save.send(sender=cls, instance=self, raw=False, using=using)
+        fields = [self._meta.get_field(name) for name in names]
+        values = dict([(field.name, field.pre_save(self, False)) for field in fields])
+        if not cls._base_manager.using(using).filter(pk=self.pk).update(**values):
+            # the row is gone, insert it again
+            super(BaseTranslationModel, self).save(force_insert=True, using=using)
+            self.mark_clean()
+            return
+        self._state.db = using
+        post_save.send(sender=cls, instance=self, created=False, raw=False, using=using)
+        for field in fields:
+            self._saved_values[field.attname] = getattr(self, field.attname)
+            self._changed_fields.discard(field.name)
+    
+    @classmethod
+    def invalidate_translation_cache(cls, instance, **kwargs):
+        """
+        Remove the translation from the (process wide) translation cache when
+        it is saved or deleted by itself (connected to post_save and
+        post_delete).
+        """
+        if not translation_cache.enabled or instance.master_id is None:
+            return
+        using = instance._state.db or DEFAULT_DB_ALIAS
+        shared_model = cls._meta.get_field('master').rel.to
+        translation_cache.invalidate_translations(
+            shared_model, [(instance.master_id, instance.language_code)], using)
         
 
 class TranslateableModelBase(ModelBase):
@@ -100,7 +205,7 @@ class TranslateableModelBase(ModelBase):
         if not found:
             raise ImproperlyConfigured("not found)")
         
-        post_save.connect(new_model.save_translations, sender=new_model, weak=False)
+        post_delete.connect(new_model.invalidate_translation_cache, sender=new_model, weak=False)
         
         return new_model
 
@@ -143,7 +248,7 @@ class TranslateableModel(models.Model):
         # in kwargs. We need to do magic.
         # extract all the shared fields (including the pk)
         for key in kwargs.keys():
-            if key in self._shared_field_names:
+            if key in self._shared_field_names or key == 'pk':
                 skwargs[key] = kwargs.pop(key)
         # do the regular init minus the translated fields
         super(TranslateableModel, self).__init__(*args, **skwargs)
@@ -151,7 +256,27 @@ class TranslateableModel(models.Model):
         tkwargs['language_code'] = tkwargs.get('language_code', get_language())
         tkwargs['master'] = self
         translated = self._meta.translations_model(*args, **tkwargs)
-        setattr(self, self._meta.translations_cache, translated)
+        cache_translation(self, translated)
+    
+    def save(self, force_insert=False, force_update=False, using=None):
+        """
+        Save the shared instance and its current translation (see
+        save_translations) in a single transaction, committed once. They are
+        removed from the translation cache after the commit, so concurrent
+        reads can't cache the old rows again in between.
+        
+        Override this (and call it) to customize saving, the translation is no
+        longer saved from a post_save signal receiver.
+        """
+        using = using or router.db_for_write(self.__class__, instance=self)
+        commit_on_success(using, self._save_with_translations,
+                           force_insert, force_update, using)
+        self.invalidate_translation_cache(self)
+    save.alters_data = True
+    
+    def _save_with_translations(self, force_insert, force_update, using):
+        super(TranslateableModel, self).save(force_insert, force_update, using)
+        self.save_translations(self, using=using)
     
     @classmethod
     def contribute_translations(cls, rel):
@@ -165,6 +290,8 @@ class TranslateableModel(models.Model):
         opts.translations_accessor = rel.get_accessor_name()
         opts.translations_model = rel.model
         opts.translations_cache = '%s_cache' % rel.get_accessor_name()
+        opts.translations_languages_cache = '%s_languages_cache' % rel.get_accessor_name()
+        opts.field_translator = FieldTranslator(cls)
         trans_opts = opts.translations_model._meta
         
         # Set descriptors
@@ -182,16 +309,44 @@ class TranslateableModel(models.Model):
             setattr(cls, field.name, attr)
     
     @classmethod
-    def save_translations(cls, instance, **kwargs):
+    def save_translations(cls, instance, using=None, **kwargs):
         """
-        When this instance is saved, also save the (cached) translation
+        When this instance is saved, also save the (cached) translation.
+        
+        Called by save. It still has the signature of a post_save receiver, so
+        it can be connected to post_save of the model (as it used to be) if
+        instances get saved bypassing save (eg with save_base).
         """
         opts = cls._meta
         if hasattr(instance, opts.translations_cache):
             trans = getattr(instance, opts.translations_cache)
             if not trans.master_id:
                 trans.master = instance
-            trans.save()
+            # unchanged translations are not written again, changed ones
+            # only get their changed columns written
+            if trans._state.adding or trans.pk is None:
+                trans.save(using=using)
+            else:
+                dirty = trans.get_dirty_fields()
+                if dirty:
+                    trans.save(using=using, update_fields=dirty)
+        if 'signal' in kwargs:
+            # connected to post_save, save invalidates the cache otherwise
+            cls.invalidate_translation_cache(instance)
+    
+    @classmethod
+    def invalidate_translation_cache(cls, instance, **kwargs):
+        """
+        Remove the shared instance and its current translation from the
+        (process wide) translation cache.
+        """
+        if not translation_cache.enabled:
+            return
+        using = instance._state.db or DEFAULT_DB_ALIAS
+        translation_cache.invalidate_shared(cls, [instance.pk], using)
+        trans = getattr(instance, cls._meta.translations_cache, None)
+        if trans is not None:
+            translation_cache.invalidate_translations(cls, [(instance.pk, trans.language_code)], using)
     
     #===========================================================================
     # Internals
@@ -1,8 +1,17 @@
 from nani.tests.admin import NormalAdminTests
 from nani.tests.basic import (OptionsTest, BasicQueryTest, CreateTest, GetTest, 
-    TranslatedTest, DeleteLanguageCodeTest, GetByLanguageTest)
-from nani.tests.dates import LatestTests
-from nani.tests.query import (FilterTests, IterTests, UpdateTests, 
-    ValuesListTests, ValuesTests, DeleteTests)
+    TranslatedTest, DeleteLanguageCodeTest, GetByLanguageTest,
+    TranslationsCacheTest, BulkCreateTest, UpsertTranslationsTest,
+    SaveTranslationsTest, AltersDataTest, AtomicSaveTest)
+from nani.tests.benchmarks import GetBenchmark, SaveBenchmark
+from nani.tests.cache import TranslationCacheTests
+from nani.tests.forms import FormSaveTests
+from nani.tests.dates import LatestTests, DatesTests, OrderingTests
+from nani.tests.query import (FilterTests, ExcludeTests, IterTests, UpdateTests, 
+    ValuesListTests, ValuesTests, DeleteTests, InBulkTests, FallbackTests,
+    PrefetchTranslationsTests, FieldTranslatorTests, FastDeleteTests,
+    FastDeleteAtomicTests, StreamTests, TranslatedValuesTests, AggregateTests,
+    TranslationCoverageTests, UntranslatedTests, DeferTests,
+    TranslationsOnlyTests, SeekTests)
 from nani.tests.related import (NormalToNormalFKTest, TransToNormalFKTest, 
     TransToTransFKTest, NormalToTransFKTest, StandardToTransFKTest)
@@ -1,10 +1,16 @@
 # -*- coding: utf-8 -*-
 from __future__ import with_statement
+from datetime import datetime
+from django.db import connection, transaction
 from django.db.models.query_utils import Q
-from nani.test_utils.context_managers import LanguageOverride
+from django.db.models.signals import post_save, pre_save
+from django.test import TransactionTestCase
+from nani import manager
+from nani.test_utils.context_managers import LanguageOverride, SettingsOverride
 from nani.test_utils.data import DOUBLE_NORMAL
 from nani.test_utils.testcase import NaniTestCase, SingleNormalTestCase
-from testproject.app.models import Normal
+from nani.utils import get_cached_translation, get_translation
+from testproject.app.models import Date, Normal
 
 
 class OptionsTest(NaniTestCase):
@@ -171,6 +177,38 @@ class GetByLanguageTest(NaniTestCase):
             obj = Normal.objects.language('ja').get(pk=1)
             self.assertEqual(obj.shared_field, DOUBLE_NORMAL[1]['shared_field'])
             self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+    
+    def test_language_args(self):
+        with LanguageOverride('en'):
+            obj = Normal.objects.language('ja').get(Q(pk=1))
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+    
+    def test_language_or_filter(self):
+        with LanguageOverride('en'):
+            qs = Normal.objects.language('ja').filter(Q(shared_field=DOUBLE_NORMAL[1]['shared_field']) |
+                                                      Q(shared_field=DOUBLE_NORMAL[2]['shared_field']))
+            obj = qs.get(pk=2)
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[2]['translated_field_ja'])
+    
+    def test_filter(self):
+        with LanguageOverride('en'):
+            qs = Normal.objects.filter(language_code='ja')
+            self.assertEqual(qs._language_code, 'ja')
+            obj = qs.get(pk=1)
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+            obj = Normal.objects.filter(language_code__in=['ja']).get(pk=1)
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+            obj = Normal.objects.filter(Q(language_code='ja')).get(pk=1)
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+    
+    def test_language_state(self):
+        qs = Normal.objects.language('ja')
+        self.assertEqual(qs._language_code, 'ja')
+        self.assertTrue(qs._language_filtered)
+        self.assertEqual(qs.filter(pk=1)._language_code, 'ja')
+        self.assertEqual(qs.language(['en', 'ja'])._language_fallbacks, ['en', 'ja'])
+        self.assertEqual(qs._language_fallbacks, None)
+        self.assertFalse(Normal.objects.all()._language_filtered)
 
 class BasicQueryTest(SingleNormalTestCase):
     def test_basic(self):
@@ -185,4 +223,252 @@ class BasicQueryTest(SingleNormalTestCase):
 class DeleteLanguageCodeTest(SingleNormalTestCase):
     def test_delete_language_code(self):
         en = self.get_obj()
-        self.assertRaises(AttributeError, delattr, en, 'language_code')
\ No newline at end of file
+        self.assertRaises(AttributeError, delattr, en, 'language_code')
+
+
+class TranslationsCacheTest(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_switch_language(self):
+        obj = Normal.objects.language('en').get(pk=1)
+        with self.assertNumQueries(1):
+            obj.language_code = 'ja'
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+        with self.assertNumQueries(0):
+            obj.language_code = 'en'
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_en'])
+            obj.language_code = 'ja'
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+    
+    def test_get_translation(self):
+        obj = Normal.objects.language('en').get(pk=1)
+        with self.assertNumQueries(1):
+            ja = get_translation(obj, 'ja')
+            self.assertEqual(get_translation(obj, 'ja'), ja)
+            self.assertEqual(ja.master, obj)
+        self.assertEqual(get_cached_translation(obj).language_code, 'en')
+        self.assertEqual(get_cached_translation(obj, 'ja'), ja)
+        self.assertEqual(get_cached_translation(obj, 'de'), None)
+    
+    def test_prefetched_languages(self):
+        with self.assertNumQueries(2):
+            obj = list(Normal._objects.filter(pk=1).prefetch_translations('en', 'ja'))[0]
+            self.assertEqual(obj.language_code, 'en')
+            obj.language_code = 'ja'
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+
+
+class BulkCreateTest(NaniTestCase):
+    def test_bulk_create_cached(self):
+        objs = [
+            Normal(language_code='en', shared_field='shared1', translated_field='English1'),
+            Normal(language_code='en', shared_field='shared2', translated_field='English2'),
+        ]
+        # two shared inserts, one batch of translations, one select for their ids
+        with self.assertNumQueries(4):
+            Normal.objects.bulk_create(objs)
+        self.assertEqual(Normal._objects.count(), 2)
+        self.assertEqual(Normal._meta.translations_model.objects.count(), 2)
+        for index, obj in enumerate(objs):
+            self.assertTrue(obj.pk)
+            self.assertTrue(get_cached_translation(obj).pk)
+            en = Normal.objects.language('en').get(pk=obj.pk)
+            self.assertEqual(en.shared_field, 'shared%s' % (index + 1))
+            self.assertEqual(en.translated_field, 'English%s' % (index + 1))
+    
+    def test_bulk_create_languages(self):
+        objs = [Normal(pk=1, shared_field='shared1'), Normal(pk=2, shared_field='shared2')]
+        languages = [
+            {'en': {'translated_field': 'English1'}, 'ja': {'translated_field': u'日本語一'}},
+            {'en': {'translated_field': 'English2'}},
+        ]
+        with LanguageOverride('en'):
+            with self.assertNumQueries(3):
+                Normal.objects.bulk_create(objs, languages=languages)
+        self.assertEqual(Normal._meta.translations_model.objects.count(), 3)
+        self.assertEqual(Normal.objects.language('ja').get(pk=1).translated_field, u'日本語一')
+        self.assertEqual(Normal.objects.language('en').get(pk=2).translated_field, 'English2')
+        with self.assertNumQueries(0):
+            self.assertEqual(objs[0].translated_field, 'English1')
+            objs[0].language_code = 'ja'
+            self.assertEqual(objs[0].translated_field, u'日本語一')
+    
+    def test_bulk_create_batches(self):
+        objs = [Normal(pk=pk, language_code='en', shared_field='shared%s' % pk,
+                       translated_field='English%s' % pk) for pk in range(1, 6)]
+        with self.assertNumQueries(9):
+            Normal.objects.bulk_create(objs, batch_size=2)
+        self.assertEqual(Normal.objects.language('en').count(), 5)
+    
+    def test_bulk_create_save(self):
+        obj = Normal(language_code='en', shared_field='shared', translated_field='English')
+        Normal.objects.bulk_create([obj])
+        obj.translated_field = 'changed'
+        obj.save()
+        self.assertEqual(Normal._meta.translations_model.objects.count(), 1)
+        self.assertEqual(Normal.objects.language('en').get(pk=obj.pk).translated_field, 'changed')
+
+
+class UpsertTranslationsTest(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def rows(self):
+        return [
+            (1, 'en', {'translated_field': 'English One'}),
+            (Normal._objects.get(pk=2), 'de', {'translated_field': 'Deutsch'}),
+            (1, 'en', {'translated_field': 'English Uno'}),
+        ]
+    
+    def check(self):
+        self.assertEqual(Normal._meta.translations_model.objects.count(), 5)
+        self.assertEqual(Normal.objects.language('en').get(pk=1).translated_field, 'English Uno')
+        self.assertEqual(Normal.objects.language('de').get(pk=2).translated_field, 'Deutsch')
+        self.assertEqual(Normal.objects.language('ja').get(pk=1).translated_field,
+                         DOUBLE_NORMAL[1]['translated_field_ja'])
+    
+    def test_upsert(self):
+        rows = self.rows()
+        with self.assertNumQueries(1):
+            self.assertEqual(Normal.objects.upsert_translations(rows), 2)
+        self.check()
+    
+    def test_upsert_fallback(self):
+        syntax = manager._upsert_syntax
+        manager._upsert_syntax = lambda connection: None
+        rows = self.rows()
+        try:
+            # select the existing ones, update them, insert the others
+            with self.assertNumQueries(3):
+                self.assertEqual(Normal.objects.upsert_translations(rows), 2)
+        finally:
+            manager._upsert_syntax = syntax
+        self.check()
+    
+    def test_upsert_batches(self):
+        rows = [(pk, code, {'translated_field': '%s%s' % (code, pk)})
+                for pk in (1, 2) for code in ('en', 'ja', 'de')]
+        with self.assertNumQueries(3):
+            Normal.objects.upsert_translations(rows, batch_size=2)
+        self.assertEqual(Normal._meta.translations_model.objects.count(), 6)
+        self.assertEqual(Normal.objects.language('ja').get(pk=2).translated_field, 'ja2')
+        self.assertEqual(Normal.objects.upsert_translations([]), 0)
+
+
+class SaveTranslationsTest(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_shared_change(self):
+        obj = Normal.objects.language('en').get(pk=1)
+        obj.shared_field = 'changed'
+        # shared row: exists check + update, the translation is not written
+        with self.assertNumQueries(2):
+            obj.save()
+        self.assertEqual(Normal.objects.language('en').get(pk=1).shared_field, 'changed')
+    
+    def test_translated_change(self):
+        obj = Normal.objects.language('en').get(pk=1)
+        obj.translated_field = 'changed'
+        self.assertEqual(get_cached_translation(obj).get_dirty_fields(), ['translated_field'])
+        # the translation is updated without an exists check
+        with self.assertNumQueries(3):
+            obj.save()
+        self.assertEqual(get_cached_translation(obj).get_dirty_fields(), [])
+        self.assertEqual(Normal.objects.language('en').get(pk=1).translated_field, 'changed')
+    
+    def test_new(self):
+        obj = Normal(language_code='en', shared_field='shared', translated_field='English')
+        with self.assertNumQueries(2):
+            obj.save()
+        with self.assertNumQueries(2):
+            obj.save()
+        obj.language_code = 'de'
+        obj.translated_field = 'Deutsch'
+        with self.assertNumQueries(3):
+            obj.save()
+        self.assertEqual(Normal.objects.language('de').get(pk=obj.pk).translated_field, 'Deutsch')
+        self.assertEqual(Normal.objects.language('en').get(pk=obj.pk).translated_field, 'English')
+    
+    def test_partial_write(self):
+        obj = Normal.objects.language('en').get(pk=1)
+        obj.translated_field = 'changed'
+        with SettingsOverride(DEBUG=True):
+            start = len(connection.queries)
+            obj.save()
+            queries = [query['sql'] for query in connection.queries[start:]]
+        updates = [sql for sql in queries if 'normaltranslation' in sql]
+        self.assertEqual(len(updates), 1)
+        self.assertTrue(updates[0].startswith('UPDATE'))
+        self.assertTrue('translated_field' in updates[0])
+        self.assertFalse('language_code' in updates[0].split('WHERE')[0])
+        self.assertFalse('master_id' in updates[0].split('WHERE')[0])
+    
+    def test_partial_write_signals(self):
+        sent = []
+        def receiver(sender, instance, **kwargs):
+            sent.append(instance.translated_field)
+        trans_model = Normal._meta.translations_model
+        post_save.connect(receiver, sender=trans_model)
+        try:
+            obj = Normal.objects.language('en').get(pk=1)
+            obj.translated_field = 'changed'
+            obj.save()
+        finally:
+            post_save.disconnect(receiver, sender=trans_model)
+        self.assertEqual(sent, ['changed'])
+    
+    def test_full_write_deleted_row(self):
+        trans = Normal._meta.translations_model.objects.get(master__pk=1, language_code='en')
+        Normal._meta.translations_model.objects.filter(pk=trans.pk).delete()
+        trans.translated_field = 'changed'
+        trans.save()
+        self.assertEqual(Normal.objects.language('en').get(pk=1).translated_field, 'changed')
+    
+    def test_partial_write_pre_save(self):
+        # written values come from the pre_save of their field, like auto_now
+        start = datetime(2000, 1, 1)
+        obj = Date.objects.language('en').create(shared_date=start, translated_date=start)
+        obj = Date.objects.language('en').get(pk=obj.pk)
+        obj.translated_date = start
+        field = Date._meta.translations_model._meta.get_field('translated_date')
+        field.auto_now = True
+        try:
+            obj.save()
+        finally:
+            field.auto_now = False
+        self.assertTrue(obj.translated_date > start)
+        self.assertEqual(Date.objects.language('en').get(pk=obj.pk).translated_date, obj.translated_date)
+    
+    def test_partial_write_deleted_row(self):
+        obj = Normal.objects.language('en').get(pk=1)
+        Normal._meta.translations_model.objects.filter(master__pk=1, language_code='en').delete()
+        obj.translated_field = 'changed'
+        obj.save()
+        self.assertEqual(Normal.objects.language('en').get(pk=1).translated_field, 'changed')
+
+
+class AltersDataTest(NaniTestCase):
+    def test_alters_data(self):
+        trans_model = Normal._meta.translations_model
+        self.assertTrue(Normal.save.alters_data)
+        self.assertTrue(trans_model.save.alters_data)
+        self.assertTrue(Normal.objects.all().bulk_create.alters_data)
+        self.assertTrue(Normal.objects.all().upsert_translations.alters_data)
+
+
+class AtomicSaveTest(TransactionTestCase):
+    def test_rollback(self):
+        def fail(sender, **kwargs):
+            raise RuntimeError('translation save failed')
+        trans_model = Normal._meta.translations_model
+        pre_save.connect(fail, sender=trans_model)
+        try:
+            obj = Normal(language_code='en', shared_field='shared', translated_field='English')
+            self.assertRaises(RuntimeError, obj.save)
+        finally:
+            pre_save.disconnect(fail, sender=trans_model)
+        self.assertEqual(Normal._objects.count(), 0)
+    
+    def test_create(self):
+        Normal.objects.language('en').create(shared_field='shared', translated_field='English')
+        transaction.rollback()
+        self.assertEqual(Normal.objects.language('en').count(), 1)
@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.db import models
+from django.db.models.signals import post_save
+from timeit import Timer
+import sys
+from nani.test_utils.data import DOUBLE_NORMAL
+from nani.test_utils.testcase import NaniTestCase
+from testproject.app.models import Normal
+
+
+def benchmark(func, number):
+    """
+    Returns the time 'func' takes per call (in microseconds), best of three
+    runs of 'number' calls.
+    """
+    return min(Timer(func).repeat(3, number)) / number * 1000000
+
+
+def benchmarks_enabled():
+    """
+    Timings depend too much on the machine to assert on, so they're only
+    measured and reported (on stderr) if NANI_BENCHMARKS is set.
+    """
+    return getattr(settings, 'NANI_BENCHMARKS', False)
+
+
+def report(message):
+    sys.stderr.write('\n%s\n' % message)
+
+
+class GetBenchmark(NaniTestCase):
+    """
+    Compares get() on a language filtered queryset with the same query on the
+    translations model: it must not need more queries, and with
+    NANI_BENCHMARKS set the per call cost of both is reported, so regressions
+    in how get() figures out the language show up.
+    """
+    fixtures = ['double_normal.json']
+    
+    def test_get(self):
+        qs = Normal.objects.language('en').filter(shared_field=DOUBLE_NORMAL[1]['shared_field'])
+        translations = Normal._meta.translations_model.objects.select_related('master').filter(
+            language_code='en', master__shared_field=DOUBLE_NORMAL[1]['shared_field'])
+        with self.assertNumQueries(1):
+            qs.get(pk=1)
+        with self.assertNumQueries(1):
+            translations.get(master__pk=1)
+        if not benchmarks_enabled():
+            return
+        nani = benchmark(lambda: qs.get(pk=1), 200)
+        plain = benchmark(lambda: translations.get(master__pk=1), 200)
+        report('get(): %.1fus per call, %.1fus on the translations model' % (nani, plain))
+
+
+class SaveBenchmark(NaniTestCase):
+    """
+    Compares saving Normal with TranslateableModel.save with saving it the way
+    it used to be done: the translation saved by the (compatibility) post_save
+    receiver. It must not need more queries, and with NANI_BENCHMARKS set the
+    saves per second of both are reported.
+    """
+    fixtures = ['double_normal.json']
+    
+    def test_saves_per_second(self):
+        obj = Normal.objects.language('en').get(pk=1)
+        def save():
+            obj.translated_field = 'save'
+            obj.save()
+        def save_with_receiver():
+            obj.translated_field = 'receiver'
+            models.Model.save(obj)
+        # shared row: exists check + update, translation: update
+        with self.assertNumQueries(3):
+            save()
+        if benchmarks_enabled():
+            override = 1000000 / benchmark(save, 200)
+        post_save.connect(Normal.save_translations, sender=Normal, weak=False,
+                          dispatch_uid='save-benchmark')
+        try:
+            with self.assertNumQueries(3):
+                save_with_receiver()
+            if benchmarks_enabled():
+                receiver = 1000000 / benchmark(save_with_receiver, 200)
+        finally:
+            post_save.disconnect(sender=Normal, dispatch_uid='save-benchmark')
+        self.assertEqual(Normal.objects.language('en').get(pk=1).translated_field, 'receiver')
+        if benchmarks_enabled():
+            report('save(): %.0f saves per second, %.0f with the post_save receiver'
+                   % (override, receiver))
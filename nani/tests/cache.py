@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+from __future__ import with_statement
+from django.db import transaction
+from django.db.models import Count
+from nani.cache import translation_cache
+from nani.test_utils.context_managers import SettingsOverride
+from nani.test_utils.data import DOUBLE_NORMAL
+from nani.test_utils.testcase import NaniTestCase
+from nani.utils import get_cached_translation, get_translation
+from testproject.app.models import Normal
+
+
+class TranslationCacheTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def setUp(self):
+        self.settings = SettingsOverride(
+            NANI_TRANSLATION_CACHE=True,
+            NANI_TRANSLATION_CACHE_BACKEND='locmem://',
+        )
+        self.settings.__enter__()
+        translation_cache.backend.clear()
+        translation_cache.reset_stats()
+    
+    def tearDown(self):
+        self.settings.__exit__(None, None, None)
+    
+    def test_get(self):
+        with self.assertNumQueries(1):
+            Normal.objects.language('ja').get(pk=1)
+        with self.assertNumQueries(0):
+            obj = Normal.objects.language('ja').get(pk=1)
+            self.assertEqual(obj.pk, 1)
+            self.assertEqual(obj.shared_field, DOUBLE_NORMAL[1]['shared_field'])
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+            self.assertEqual(obj.language_code, 'ja')
+        with self.assertNumQueries(0):
+            obj = Normal.objects.get(pk=1, language_code='ja')
+        self.assertEqual(translation_cache.hits, 2)
+        self.assertEqual(translation_cache.misses, 1)
+    
+    def test_get_not_cacheable(self):
+        Normal.objects.language('en').get(shared_field=DOUBLE_NORMAL[1]['shared_field'])
+        with self.assertNumQueries(1):
+            Normal.objects.language('en').get(shared_field=DOUBLE_NORMAL[1]['shared_field'])
+        self.assertEqual(translation_cache.hits, 0)
+        self.assertEqual(translation_cache.misses, 0)
+    
+    def test_get_annotated_not_cacheable(self):
+        Normal.objects.language('en').get(pk=1)
+        with self.assertNumQueries(1):
+            obj = Normal.objects.language('en').annotate(Count('translations')).get(pk=1)
+        self.assertEqual(obj.translations__count, 2)
+        self.assertEqual(translation_cache.hits, 0)
+    
+    def test_keys_per_database(self):
+        self.assertNotEqual(translation_cache.shared_key(Normal, 1, 'default'),
+                            translation_cache.shared_key(Normal, 1, 'other'))
+        self.assertNotEqual(translation_cache.translation_key(Normal, 1, 'en', 'default'),
+                            translation_cache.translation_key(Normal, 1, 'en', 'other'))
+        Normal.objects.language('en').get(pk=1)
+        self.assertEqual(translation_cache.get_combined(Normal, 1, 'en', 'other'), None)
+        trans = translation_cache.get_combined(Normal, 1, 'en', 'default')
+        self.assertEqual(trans.master._state.db, 'default')
+    
+    def test_get_translation(self):
+        get_translation(Normal._objects.get(pk=1), 'ja')
+        obj = Normal._objects.get(pk=1)
+        with self.assertNumQueries(0):
+            trans = get_translation(obj, 'ja')
+        self.assertEqual(trans.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+        self.assertEqual(translation_cache.hits, 1)
+        self.assertEqual(translation_cache.misses, 1)
+    
+    def test_save_invalidates(self):
+        obj = Normal.objects.language('en').get(pk=1)
+        obj.translated_field = 'changed'
+        obj.shared_field = 'changed shared'
+        obj.save()
+        obj = Normal.objects.language('en').get(pk=1)
+        self.assertEqual(obj.translated_field, 'changed')
+        self.assertEqual(obj.shared_field, 'changed shared')
+    
+    def test_translation_save_invalidates(self):
+        Normal.objects.language('ja').get(pk=1)
+        trans = Normal._meta.translations_model.objects.get(master__pk=1, language_code='ja')
+        trans.translated_field = 'direct'
+        trans.save()
+        self.assertEqual(Normal.objects.language('ja').get(pk=1).translated_field, 'direct')
+        trans = Normal._meta.translations_model.objects.get(master__pk=1, language_code='ja')
+        trans.translated_field = 'partial'
+        trans.save(update_fields=['translated_field'])
+        self.assertEqual(Normal.objects.language('ja').get(pk=1).translated_field, 'partial')
+    
+    def test_translation_delete_invalidates(self):
+        Normal.objects.language('ja').get(pk=1)
+        Normal._meta.translations_model.objects.get(master__pk=1, language_code='ja').delete()
+        self.assertRaises(Normal._meta.translations_model.DoesNotExist,
+                          Normal.objects.language('ja').get, pk=1)
+    
+    def test_save_invalidates_after_commit(self):
+        old = Normal.objects.language('en').get(pk=1)
+        obj = Normal.objects.language('en').get(pk=1)
+        obj.translated_field = 'changed'
+        # (the test case manages the transaction, so save only calls
+        # commit_unless_managed)
+        commit = transaction.commit_unless_managed
+        def read_then_commit(*args, **kwargs):
+            # a concurrent read right before the commit caches the old rows
+            translation_cache.set_combined(old, get_cached_translation(old))
+            return commit(*args, **kwargs)
+        transaction.commit_unless_managed = read_then_commit
+        try:
+            obj.save()
+        finally:
+            transaction.commit_unless_managed = commit
+        self.assertEqual(Normal.objects.language('en').get(pk=1).translated_field, 'changed')
+    
+    def test_update_invalidates(self):
+        Normal.objects.language('en').get(pk=1)
+        Normal.objects.language('en').update(translated_field='changed', shared_field='changed shared')
+        obj = Normal.objects.language('en').get(pk=1)
+        self.assertEqual(obj.translated_field, 'changed')
+        self.assertEqual(obj.shared_field, 'changed shared')
+    
+    def test_delete_invalidates(self):
+        Normal.objects.language('en').get(pk=1)
+        Normal.objects.language('en').filter(pk=1).delete()
+        self.assertRaises(Normal._meta.translations_model.DoesNotExist,
+                          Normal.objects.language('en').get, pk=1)
+    
+    def test_delete_translations_invalidates(self):
+        Normal.objects.language('en').get(pk=1)
+        Normal.objects.language('en').delete_translations()
+        self.assertRaises(Normal._meta.translations_model.DoesNotExist,
+                          Normal.objects.language('en').get, pk=1)
+    
+    def test_disabled(self):
+        with SettingsOverride(NANI_TRANSLATION_CACHE=False):
+            Normal.objects.language('en').get(pk=1)
+            with self.assertNumQueries(1):
+                Normal.objects.language('en').get(pk=1)
+        self.assertEqual(translation_cache.hits, 0)
+        self.assertEqual(translation_cache.misses, 0)
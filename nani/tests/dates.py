@@ -1,4 +1,7 @@
-from nani.test_utils.data import DATES_REVERSED, D3
+from datetime import datetime
+from django.db import connection
+from nani.management import sql_translations_indexes
+from nani.test_utils.data import DATES_REVERSED, D1, D2, D3
 from nani.test_utils.testcase import NaniTestCase
 from testproject.app.models import Date
 
@@ -13,4 +16,57 @@ class LatestTests(NaniTestCase):
         latest = Date.objects.language('en').latest('translated_date')
         self.assertEqual(latest.pk, DATES_REVERSED[D3]['translated_date_en'])
         latest = Date.objects.language('ja').latest('translated_date')
-        self.assertEqual(latest.pk, DATES_REVERSED[D3]['translated_date_ja'])
\ No newline at end of file
+        self.assertEqual(latest.pk, DATES_REVERSED[D3]['translated_date_ja'])
+
+
+class DatesTests(NaniTestCase):
+    fixtures = ['dates.json']
+    
+    def test_shared_dates(self):
+        with self.assertNumQueries(1):
+            dates = list(Date.objects.language('en').dates('shared_date', 'year'))
+        self.assertEqual(dates, [datetime(1988, 1, 1), datetime(2011, 1, 1)])
+        
+    def test_translated_dates(self):
+        with self.assertNumQueries(1):
+            dates = list(Date.objects.language('en').dates('translated_date', 'month', order='DESC'))
+        self.assertEqual(dates, [datetime(2011, 2, 1), datetime(2011, 1, 1), datetime(1988, 7, 1)])
+        
+    def test_respects_language_filter(self):
+        dates = list(Date.objects.language('ja').filter(translated_date__gte=D2).dates('translated_date', 'day'))
+        self.assertEqual(dates, [datetime(D2.year, D2.month, D2.day), datetime(D3.year, D3.month, D3.day)])
+        dates = list(Date.objects.language('ja').filter(translated_date__lt=D2).dates('shared_date', 'day'))
+        self.assertEqual(dates, [D3.replace(hour=0, minute=0, second=0)])
+        
+    def test_datetimes(self):
+        dates = list(Date.objects.datetimes('shared_date', 'day'))
+        self.assertEqual(dates, [D1, D2, datetime(D3.year, D3.month, D3.day)])
+
+
+class OrderingTests(NaniTestCase):
+    fixtures = ['dates.json']
+    
+    def test_reverse_translated(self):
+        qs = Date.objects.language('en').order_by('translated_date')
+        self.assertEqual([obj.translated_date for obj in qs], [D1, D2, D3])
+        self.assertEqual([obj.translated_date for obj in qs.reverse()], [D3, D2, D1])
+        
+    def test_reverse_shared(self):
+        qs = Date.objects.language('ja').order_by('shared_date').reverse()
+        self.assertEqual([obj.shared_date for obj in qs], [D3, D2, D1])
+        self.assertEqual([obj.pk for obj in qs.reverse()], [1, 3, 2])
+        
+    def test_index_together(self):
+        model = Date._meta.translations_model
+        self.assertEqual(model._meta.index_together, [('language_code', 'translated_date')])
+        statements = sql_translations_indexes(model, connection)
+        self.assertEqual(len(statements), 1)
+        if 'sqlite3' not in connection.settings_dict['ENGINE']:
+            return
+        cursor = connection.cursor()
+        cursor.execute('PRAGMA index_list(%s)' % connection.ops.quote_name(model._meta.db_table))
+        indexes = {}
+        for row in cursor.fetchall():
+            cursor.execute('PRAGMA index_info(%s)' % connection.ops.quote_name(row[1]))
+            indexes[row[1]] = [info[2] for info in cursor.fetchall()]
+        self.assertTrue(['language_code', 'translated_date'] in indexes.values())
@@ -0,0 +1,50 @@
+from nani.forms import TranslateableModelForm
+from nani.test_utils.context_managers import LanguageOverride
+from nani.test_utils.data import DOUBLE_NORMAL
+from nani.test_utils.testcase import NaniTestCase
+from nani.utils import get_cached_translation
+from testproject.app.models import Normal
+
+
+class NormalForm(TranslateableModelForm):
+    class Meta(TranslateableModelForm.Meta):
+        model = Normal
+
+
+class FormSaveTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_create(self):
+        with LanguageOverride('en'):
+            form = NormalForm({'shared_field': 'shared', 'translated_field': 'English'})
+            self.assertTrue(form.is_valid())
+            # one insert for the shared row and one for the translation
+            with self.assertNumQueries(2):
+                obj = form.save()
+        self.assertEqual(obj.translated_field, 'English')
+        obj = Normal.objects.language('en').get(pk=obj.pk)
+        self.assertEqual(obj.shared_field, 'shared')
+        self.assertEqual(obj.translated_field, 'English')
+    
+    def test_change(self):
+        with LanguageOverride('en'):
+            obj = Normal.objects.language('en').get(pk=1)
+            form = NormalForm({'shared_field': DOUBLE_NORMAL[1]['shared_field'],
+                               'translated_field': 'changed'}, instance=obj)
+            self.assertTrue(form.is_valid())
+            # shared row: exists check + update, translation: a single update
+            with self.assertNumQueries(3):
+                obj = form.save()
+        self.assertEqual(Normal.objects.language('en').get(pk=1).translated_field, 'changed')
+        self.assertEqual(Normal.objects.language('ja').get(pk=1).translated_field,
+                         DOUBLE_NORMAL[1]['translated_field_ja'])
+    
+    def test_no_commit(self):
+        with LanguageOverride('en'):
+            form = NormalForm({'shared_field': 'shared', 'translated_field': 'English'})
+            self.assertTrue(form.is_valid())
+            with self.assertNumQueries(0):
+                obj = form.save(commit=False)
+            self.assertEqual(get_cached_translation(obj).translated_field, 'English')
+            obj.save()
+        self.assertEqual(Normal.objects.language('en').get(pk=obj.pk).translated_field, 'English')
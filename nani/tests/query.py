@@ -1,8 +1,19 @@
 # -*- coding: utf-8 -*-
-from nani.test_utils.context_managers import LanguageOverride
+from datetime import datetime
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.db.models import Count, Max, sql
+from django.db.models.query_utils import Q
+from django.db.models.signals import pre_delete
+from django.test import TransactionTestCase
+import gc
+import weakref
+from nani.manager import TranslationMixin
+from nani.test_utils.context_managers import LanguageOverride, StdoutOverride
 from nani.test_utils.data import DOUBLE_NORMAL
 from nani.test_utils.testcase import NaniTestCase
-from testproject.app.models import Normal
+from nani.utils import R, get_cached_translation, get_translation
+from testproject.app.models import Date, Normal, Ordered, Standard
 
 
 class FilterTests(NaniTestCase):
@@ -30,6 +41,43 @@ class FilterTests(NaniTestCase):
         self.assertEqual(obj2.translated_field, DOUBLE_NORMAL[2]['translated_field_en'])
 
 
+class ExcludeTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_exclude_shared(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('en').exclude(shared_field=DOUBLE_NORMAL[1]['shared_field']))
+        self.assertEqual([obj.pk for obj in objs], [2])
+        self.assertEqual(objs[0].translated_field, DOUBLE_NORMAL[2]['translated_field_en'])
+    
+    def test_exclude_translated(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.exclude(translated_field__contains='English'))
+        self.assertEqual([(obj.pk, obj.language_code) for obj in objs], [(1, 'ja'), (2, 'ja')])
+    
+    def test_exclude_q(self):
+        q = Q(shared_field=DOUBLE_NORMAL[1]['shared_field']) | Q(translated_field=DOUBLE_NORMAL[2]['translated_field_ja'])
+        objs = list(Normal.objects.language('ja').exclude(q))
+        self.assertEqual(objs, [])
+        objs = list(Normal.objects.language('en').exclude(q))
+        self.assertEqual([obj.pk for obj in objs], [2])
+    
+    def test_exclude_multi_valued(self):
+        Normal._meta.translations_model.objects.filter(master__pk=2, language_code='ja').delete()
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('en').exclude(translations__language_code='ja'))
+        self.assertEqual([obj.pk for obj in objs], [2])
+    
+    def test_complex_filter(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('en').complex_filter({'shared_field': DOUBLE_NORMAL[2]['shared_field']}))
+        self.assertEqual([obj.pk for obj in objs], [2])
+        objs = list(Normal.objects.language('en').complex_filter(Q(shared_field=DOUBLE_NORMAL[1]['shared_field'])))
+        self.assertEqual([obj.pk for obj in objs], [1])
+        objs = list(Normal.objects.language('en').complex_filter(R(master__shared_field=DOUBLE_NORMAL[1]['shared_field'])))
+        self.assertEqual([obj.pk for obj in objs], [1])
+
+
 class IterTests(NaniTestCase):
     fixtures = ['double_normal.json']
     
@@ -204,4 +252,637 @@ class DeleteTests(NaniTestCase):
         Normal.objects.language('en').delete_translations()
         self.assertEqual(Normal.objects.count(), 2)
         self.assertEqual(Normal.objects._real_manager.count(), 2)
-        self.assertEqual(Normal._meta.translations_model.objects.count(), 2)
\ No newline at end of file
+        self.assertEqual(Normal._meta.translations_model.objects.count(), 2)
+
+class InBulkTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_in_bulk(self):
+        with self.assertNumQueries(1):
+            objs = Normal.objects.language('en').in_bulk([1, 2])
+        self.assertEqual(sorted(objs.keys()), [1, 2])
+        with self.assertNumQueries(0):
+            for pk, obj in objs.items():
+                self.assertEqual(obj.pk, pk)
+                self.assertEqual(obj.shared_field, DOUBLE_NORMAL[pk]['shared_field'])
+                self.assertEqual(obj.translated_field, DOUBLE_NORMAL[pk]['translated_field_en'])
+    
+    def test_in_bulk_language_code(self):
+        with LanguageOverride('en'):
+            with self.assertNumQueries(1):
+                objs = Normal.objects.in_bulk([1, 2], language_code='ja')
+        self.assertEqual(objs[1].translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+        self.assertEqual(objs[2].translated_field, DOUBLE_NORMAL[2]['translated_field_ja'])
+    
+    def test_in_bulk_nolang(self):
+        with LanguageOverride('ja'):
+            objs = Normal.objects.in_bulk([1])
+        self.assertEqual(objs.keys(), [1])
+        self.assertEqual(objs[1].translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+    
+    def test_in_bulk_missing(self):
+        objs = Normal.objects.language('en').in_bulk([1, 3])
+        self.assertEqual(objs.keys(), [1])
+    
+    def test_in_bulk_empty(self):
+        with self.assertNumQueries(0):
+            objs = Normal.objects.language('en').in_bulk([])
+        self.assertEqual(objs, {})
+    
+    def test_in_bulk_batches(self):
+        qs = Normal.objects.language('en')
+        qs.batch_size = 1
+        with self.assertNumQueries(2):
+            objs = qs.in_bulk([1, 2])
+        self.assertEqual(sorted(objs.keys()), [1, 2])
+
+
+class FallbackTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def setUp(self):
+        # Normal 2 has no japanese translation
+        Normal._meta.translations_model.objects.filter(master__pk=2, language_code='ja').delete()
+    
+    def test_iter(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language(['ja', 'en']))
+        self.assertEqual(len(objs), 2)
+        obj1, obj2 = objs
+        self.assertEqual(obj1.pk, 1)
+        self.assertEqual(obj1.language_code, 'ja')
+        self.assertEqual(obj1.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+        self.assertEqual(obj2.pk, 2)
+        self.assertEqual(obj2.language_code, 'en')
+        self.assertEqual(obj2.translated_field, DOUBLE_NORMAL[2]['translated_field_en'])
+    
+    def test_fallbacks_kwarg(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('ja', fallbacks=['en']))
+        self.assertEqual([obj.language_code for obj in objs], ['ja', 'en'])
+    
+    def test_preferred_wins(self):
+        objs = list(Normal.objects.language(['en', 'ja']))
+        self.assertEqual([obj.language_code for obj in objs], ['en', 'en'])
+    
+    def test_get(self):
+        with self.assertNumQueries(1):
+            obj = Normal.objects.language(['ja', 'en']).get(pk=2)
+        self.assertEqual(obj.language_code, 'en')
+        self.assertEqual(obj.translated_field, DOUBLE_NORMAL[2]['translated_field_en'])
+    
+    def test_count_and_slice(self):
+        qs = Normal.objects.language(['ja', 'en'])
+        self.assertEqual(qs.count(), 2)
+        self.assertEqual([obj.pk for obj in qs[1:]], [2])
+    
+    def test_order_by_translated(self):
+        # 1 is shown in japanese, 2 in english
+        qs = Normal.objects.language(['ja', 'en']).order_by('translated_field')
+        with self.assertNumQueries(1):
+            self.assertEqual([obj.pk for obj in qs], [2, 1])
+        qs = Normal.objects.language(['ja', 'en']).order_by('-translated_field')
+        self.assertEqual([obj.pk for obj in qs], [1, 2])
+    
+    def test_slice_in_sql(self):
+        qs = Normal.objects.language(['ja', 'en']).order_by('translated_field')
+        with self.assertNumQueries(1):
+            objs = qs[0:1]
+            self.assertEqual([(obj.pk, obj.language_code) for obj in objs], [(2, 'en')])
+        with self.assertNumQueries(1):
+            obj = qs[1]
+        self.assertEqual((obj.pk, obj.language_code), (1, 'ja'))
+        self.assertEqual(obj.translated_field, DOUBLE_NORMAL[1]['translated_field_ja'])
+        self.assertEqual(list(qs[2:]), [])
+        self.assertEqual([obj.pk for obj in Normal.objects.language(['de', 'en', 'ja'])[:5]], [1, 2])
+    
+    def test_slice_filtered(self):
+        # the japanese translation of 1 is filtered out, so english is the best
+        qs = Normal.objects.language(['ja', 'en']).filter(translated_field__startswith='English')
+        expected = [(1, 'en'), (2, 'en')]
+        self.assertEqual([(obj.pk, obj.language_code) for obj in qs], expected)
+        self.assertEqual(qs.count(), 2)
+        self.assertEqual([(obj.pk, obj.language_code) for obj in qs._clone()[:10]], expected)
+        self.assertEqual([(obj.pk, obj.language_code) for obj in qs._clone()[1:]], expected[1:])
+    
+    def test_aggregate(self):
+        qs = Normal.objects.language(['ja', 'en'])
+        self.assertEqual(qs.count(), 2)
+        self.assertEqual(qs.aggregate(n=Count('pk')), {'n': 2})
+    
+    def test_annotate(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language(['ja', 'en']).annotate(Count('translations')))
+        self.assertEqual([(obj.pk, obj.language_code) for obj in objs], [(1, 'ja'), (2, 'en')])
+        self.assertEqual([obj.translations__count for obj in objs], [2, 1])
+    
+    def test_get_translation(self):
+        obj = Normal.objects._real_manager.get(pk=2)
+        with self.assertNumQueries(1):
+            trans = get_translation(obj, ['ja', 'en'])
+        self.assertEqual(trans.language_code, 'en')
+        self.assertRaises(Normal._meta.translations_model.DoesNotExist,
+                          get_translation, obj, ['ja', 'de'])
+
+
+class PrefetchTranslationsTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_prefetch(self):
+        with self.assertNumQueries(2):
+            for obj in Normal._objects.all().prefetch_translations('ja'):
+                self.assertEqual(obj.translated_field, DOUBLE_NORMAL[obj.pk]['translated_field_ja'])
+                self.assertEqual(obj.language_code, 'ja')
+    
+    def test_prefetch_nolang(self):
+        with LanguageOverride('en'):
+            with self.assertNumQueries(2):
+                for obj in Normal._objects.prefetch_translations():
+                    self.assertEqual(obj.translated_field, DOUBLE_NORMAL[obj.pk]['translated_field_en'])
+    
+    def test_prefetch_order(self):
+        Normal._meta.translations_model.objects.filter(master__pk=2, language_code='ja').delete()
+        with self.assertNumQueries(2):
+            objs = list(Normal._objects.filter(pk__in=[1, 2]).prefetch_translations('ja', 'en'))
+            self.assertEqual([obj.language_code for obj in objs], ['ja', 'en'])
+    
+    def test_prefetch_empty(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(list(Normal._objects.filter(pk=3).prefetch_translations('en')), [])
+    
+    def test_prefetch_batched(self):
+        batch_size = TranslationMixin.batch_size
+        TranslationMixin.batch_size = 1
+        try:
+            with self.assertNumQueries(3):
+                objs = list(Normal._objects.prefetch_translations('ja'))
+        finally:
+            TranslationMixin.batch_size = batch_size
+        self.assertEqual([obj.translated_field for obj in objs],
+                         [DOUBLE_NORMAL[1]['translated_field_ja'], DOUBLE_NORMAL[2]['translated_field_ja']])
+
+
+class FieldTranslatorTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_shared_translator(self):
+        qs1 = Normal.objects.language('en')
+        qs2 = Normal.objects.filter(shared_field='Shared1')
+        self.assertTrue(qs1.field_translator is qs2.field_translator)
+        self.assertTrue(qs1.field_translator is Normal._meta.field_translator)
+    
+    def test_translate(self):
+        translator = Normal._meta.field_translator
+        self.assertEqual(translator.get('shared_field'), 'master__shared_field')
+        self.assertEqual(translator.get('shared_field__contains'), 'master__shared_field__contains')
+        self.assertEqual(translator.get('-shared_field'), '-master__shared_field')
+        self.assertEqual(translator.get('pk'), 'master__pk')
+        self.assertEqual(translator.get('translated_field'), 'translated_field')
+        self.assertEqual(translator.get('-translated_field'), '-translated_field')
+        self.assertEqual(translator.get('shared_field_x'), 'shared_field_x')
+        self.assertEqual(translator.get('?'), '?')
+    
+    def test_order_by_descending_shared(self):
+        qs = Normal.objects.language('en').order_by('-shared_field')
+        self.assertEqual([obj.pk for obj in qs], [2, 1])
+
+
+
+class FastDeleteTests(NaniTestCase):
+    fixtures = ['dates.json']
+    
+    def test_delete_all(self):
+        with self.assertNumQueries(3):
+            Date.objects.language('en').delete()
+        self.assertEqual(Date._objects.count(), 0)
+        self.assertEqual(Date._meta.translations_model.objects.count(), 0)
+    
+    def test_delete_filtered(self):
+        with self.assertNumQueries(3):
+            Date.objects.language('en').filter(pk=1).delete()
+        self.assertEqual(list(Date._objects.values_list('pk', flat=True).order_by('pk')), [2, 3])
+        self.assertEqual(Date._meta.translations_model.objects.filter(master__pk=1).count(), 0)
+        self.assertEqual(Date._meta.translations_model.objects.count(), 4)
+    
+    def test_delete_keeps_other_rows(self):
+        # an orphan translation (foreign keys aren't enforced by SQLite)
+        trans_model = Date._meta.translations_model
+        trans_model.objects.create(master_id=99, language_code='en', translated_date=datetime(2000, 1, 1))
+        Date.objects.language('en').filter(pk=1).delete()
+        self.assertEqual(trans_model.objects.filter(master__pk=99).count(), 1)
+    
+    def test_delete_batches(self):
+        with self.assertNumQueries(7):
+            Date.objects.language('en').delete(batch_size=1)
+        self.assertEqual(Date._objects.count(), 0)
+    
+    def test_delete_translations(self):
+        with self.assertNumQueries(1):
+            Date.objects.language('en').delete_translations()
+        self.assertEqual(Date._objects.count(), 3)
+        self.assertEqual(Date._meta.translations_model.objects.count(), 3)
+        self.assertEqual(Date._meta.translations_model.objects.filter(language_code='en').count(), 0)
+    
+    def test_signals_connected(self):
+        deleted = []
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+        pre_delete.connect(receiver, sender=Date)
+        try:
+            Date.objects.language('en').filter(pk=1).delete()
+        finally:
+            pre_delete.disconnect(receiver, sender=Date)
+        self.assertEqual(deleted, [1])
+        self.assertEqual(Date._objects.count(), 2)
+    
+    def test_parents(self):
+        qs = Date.objects.language('en')
+        self.assertTrue(qs._can_fast_delete())
+        parents = Date._meta.parents
+        Date._meta.parents = {Normal: None}
+        try:
+            self.assertFalse(qs._can_fast_delete())
+        finally:
+            Date._meta.parents = parents
+
+
+class FastDeleteAtomicTests(TransactionTestCase):
+    fixtures = ['dates.json']
+    
+    def test_rollback(self):
+        do_query = sql.DeleteQuery.do_query
+        def fail(query, table, where, using):
+            if table == Date._meta.translations_model._meta.db_table:
+                raise DatabaseError('delete failed')
+            return do_query(query, table, where, using)
+        sql.DeleteQuery.do_query = fail
+        try:
+            self.assertRaises(DatabaseError, Date.objects.language('en').delete)
+        finally:
+            sql.DeleteQuery.do_query = do_query
+        self.assertEqual(Date._objects.count(), 3)
+        self.assertEqual(Date._meta.translations_model.objects.count(), 6)
+
+
+
+class StreamTests(NaniTestCase):
+    def create(self, count, start=1):
+        objs = [Normal(pk=pk, shared_field='shared%s' % pk) for pk in range(start, start + count)]
+        languages = [{'en': {'translated_field': 'English%s' % obj.pk},
+                      'ja': {'translated_field': u'日本語%s' % obj.pk}} for obj in objs]
+        Normal.objects.bulk_create(objs, languages=languages)
+    
+    def peak_alive(self, qs, chunk_size):
+        """
+        Stream qs and return the maximum number of yielded instances that are
+        still alive at any point.
+        """
+        refs = []
+        peak = 0
+        for obj in qs.stream(chunk_size=chunk_size):
+            refs.append(weakref.ref(obj))
+            del obj
+            gc.collect()
+            peak = max(peak, len([ref for ref in refs if ref() is not None]))
+        return peak, len(refs)
+    
+    def test_stream(self):
+        self.create(5)
+        with self.assertNumQueries(3):
+            objs = list(Normal.objects.language('en').stream(chunk_size=2))
+        self.assertEqual([obj.pk for obj in objs], [1, 2, 3, 4, 5])
+        for obj in objs:
+            self.assertEqual(obj.translated_field, 'English%s' % obj.pk)
+    
+    def test_stream_annotated(self):
+        self.create(3)
+        qs = Normal.objects.language('en').annotate(Count('translations'))
+        objs = list(qs.stream(chunk_size=2))
+        self.assertEqual([(obj.pk, obj.translations__count) for obj in objs], [(1, 2), (2, 2), (3, 2)])
+    
+    def test_stream_all_languages(self):
+        self.create(3)
+        objs = list(Normal.objects.all().stream(chunk_size=2))
+        self.assertEqual(len(objs), 6)
+        self.assertEqual(sorted([(obj.pk, obj.language_code) for obj in objs]),
+                         [(1, 'en'), (1, 'ja'), (2, 'en'), (2, 'ja'), (3, 'en'), (3, 'ja')])
+    
+    def test_stream_fallbacks(self):
+        self.create(5)
+        Normal._meta.translations_model.objects.filter(master__pk__in=[2, 3], language_code='ja').delete()
+        objs = list(Normal.objects.language(['ja', 'en']).stream(chunk_size=3))
+        self.assertEqual([(obj.pk, obj.language_code) for obj in objs],
+                         [(1, 'ja'), (2, 'en'), (3, 'en'), (4, 'ja'), (5, 'ja')])
+    
+    def test_stream_fallbacks_shared_ordering(self):
+        # the shared model is ordered by shared_field, descending
+        objs = [Ordered(pk=pk, shared_field='shared%s' % pk) for pk in range(1, 6)]
+        languages = [{'en': {'translated_field': 'English%s' % obj.pk},
+                      'ja': {'translated_field': u'日本語%s' % obj.pk}} for obj in objs]
+        del languages[2]['ja']
+        Ordered.objects.bulk_create(objs, languages=languages)
+        objs = list(Ordered.objects.language(['ja', 'en']).stream(chunk_size=3))
+        self.assertEqual([(obj.pk, obj.language_code) for obj in objs],
+                         [(1, 'ja'), (2, 'ja'), (3, 'en'), (4, 'ja'), (5, 'ja')])
+    
+    def test_memory_flat(self):
+        self.create(10)
+        small_peak, small_count = self.peak_alive(Normal.objects.language('en'), 4)
+        self.create(30, start=11)
+        big_peak, big_count = self.peak_alive(Normal.objects.language('en'), 4)
+        self.assertEqual(small_count, 10)
+        self.assertEqual(big_count, 40)
+        self.assertTrue(big_peak <= 4, big_peak)
+        self.assertEqual(small_peak, big_peak)
+
+
+class TranslatedValuesTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_dict(self):
+        with self.assertNumQueries(1):
+            values = list(Normal.objects.language('en').translated_values('shared_field', 'translated_field'))
+        check = [
+            {'shared_field': DOUBLE_NORMAL[1]['shared_field'],
+             'translated_field': DOUBLE_NORMAL[1]['translated_field_en']},
+            {'shared_field': DOUBLE_NORMAL[2]['shared_field'],
+             'translated_field': DOUBLE_NORMAL[2]['translated_field_en']},
+        ]
+        self.assertEqual(values, check)
+    
+    def test_default_fields(self):
+        values = list(Normal.objects.language('ja').filter(pk=1).translated_values())
+        check = [{
+            'id': 1,
+            'shared_field': DOUBLE_NORMAL[1]['shared_field'],
+            'translated_field': DOUBLE_NORMAL[1]['translated_field_ja'],
+            'language_code': 'ja',
+        }]
+        self.assertEqual(values, check)
+    
+    def test_tuple(self):
+        values = list(Normal.objects.language('en').translated_values('pk', 'translated_field', row_type='tuple'))
+        self.assertEqual(values, [(1, DOUBLE_NORMAL[1]['translated_field_en']),
+                                  (2, DOUBLE_NORMAL[2]['translated_field_en'])])
+    
+    def test_fallbacks(self):
+        Normal._meta.translations_model.objects.filter(master__pk=2, language_code='ja').delete()
+        with self.assertNumQueries(1):
+            values = list(Normal.objects.language(['ja', 'en']).translated_values(
+                'pk', 'language_code', row_type='tuple'))
+        self.assertEqual(values, [(1, 'ja'), (2, 'en')])
+    
+    def test_namedtuple(self):
+        qs = Normal.objects.language('en').translated_values('shared_field', 'translated_field', row_type='namedtuple')
+        values = list(qs.filter(shared_field=DOUBLE_NORMAL[2]['shared_field']))
+        self.assertEqual(len(values), 1)
+        self.assertEqual(values[0].shared_field, DOUBLE_NORMAL[2]['shared_field'])
+        self.assertEqual(values[0].translated_field, DOUBLE_NORMAL[2]['translated_field_en'])
+    
+    def test_invalid_row_type(self):
+        self.assertRaises(ValueError, Normal.objects.language('en').translated_values, row_type='list')
+
+
+
+class AggregateTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_aggregate(self):
+        with self.assertNumQueries(1):
+            result = Normal.objects.language('en').aggregate(
+                Max('shared_field'), Max('translated_field'), count=Count('pk'))
+        self.assertEqual(result, {
+            'shared_field__max': DOUBLE_NORMAL[2]['shared_field'],
+            'translated_field__max': DOUBLE_NORMAL[2]['translated_field_en'],
+            'count': 2,
+        })
+    
+    def test_aggregate_filtered(self):
+        result = Normal.objects.filter(shared_field=DOUBLE_NORMAL[1]['shared_field']).aggregate(Count('translated_field'))
+        self.assertEqual(result, {'translated_field__count': 2})
+    
+    def test_annotate(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('en').annotate(Count('translations')))
+            self.assertEqual(len(objs), 2)
+            for obj in objs:
+                self.assertEqual(obj.translations__count, 2)
+                self.assertEqual(obj.translated_field, DOUBLE_NORMAL[obj.pk]['translated_field_en'])
+    
+    def test_count_per_language(self):
+        Normal._meta.translations_model.objects.filter(master__pk=2, language_code='ja').delete()
+        with self.assertNumQueries(1):
+            values = list(Normal.objects.values('language_code').annotate(count=Count('pk')).order_by('language_code'))
+        self.assertEqual(values, [{'language_code': 'en', 'count': 2},
+                                  {'language_code': 'ja', 'count': 1}])
+
+
+
+class TranslationCoverageTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def setUp(self):
+        Normal._meta.translations_model.objects.filter(master__pk=2, language_code='ja').delete()
+    
+    def test_coverage(self):
+        with self.assertNumQueries(2):
+            coverage = Normal.objects.translation_coverage(['en', 'ja', 'de'])
+        self.assertEqual(coverage['en']['count'], 2)
+        self.assertEqual(coverage['en']['missing_count'], 0)
+        self.assertEqual(coverage['ja']['count'], 1)
+        self.assertEqual(coverage['ja']['missing_count'], 1)
+        self.assertEqual(coverage['de']['count'], 0)
+        self.assertEqual(coverage['de']['missing_count'], 2)
+        with self.assertNumQueries(1):
+            self.assertEqual([obj.pk for obj in coverage['ja']['missing']], [2])
+        self.assertEqual(list(coverage['en']['missing']), [])
+        self.assertEqual(sorted([obj.pk for obj in coverage['de']['missing']]), [1, 2])
+    
+    def test_coverage_default_languages(self):
+        coverage = Normal.objects.translation_coverage()
+        self.assertEqual(sorted(coverage.keys()), ['en', 'ja'])
+    
+    def test_command(self):
+        with StdoutOverride() as buffer:
+            call_command('translation_coverage', 'app.Normal', languages='en,ja', list_missing=True)
+            output = buffer.getvalue()
+        self.assertEqual(output.strip().splitlines(), [
+            'app.Normal',
+            '  en: 2/2 (100.0%), 0 missing',
+            '  ja: 1/2 (50.0%), 1 missing',
+            '    2',
+        ])
+
+
+class UntranslatedTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def setUp(self):
+        Normal._meta.translations_model.objects.filter(master__pk=2, language_code='ja').delete()
+        Normal._objects.create(pk=3, shared_field='shared3')
+    
+    def test_missing_language(self):
+        with self.assertNumQueries(1):
+            self.assertEqual([obj.pk for obj in Normal.objects.missing_language('ja')], [2, 3])
+        self.assertEqual([obj.pk for obj in Normal.objects.missing_language('en')], [3])
+        with LanguageOverride('ja'):
+            self.assertEqual([obj.pk for obj in Normal.objects.missing_language()], [2, 3])
+    
+    def test_untranslated(self):
+        self.assertEqual([obj.pk for obj in Normal.objects.untranslated()], [3])
+        self.assertEqual([obj.pk for obj in Normal.objects.untranslated('ja', 'de')], [2, 3])
+        self.assertEqual([obj.pk for obj in Normal.objects.untranslated('en', 'ja')], [3])
+    
+    def test_chaining(self):
+        qs = Normal._objects.filter(pk__in=[1, 2]).missing_language('ja')
+        self.assertEqual([obj.pk for obj in qs], [2])
+        qs = Normal._objects.missing_language('ja').filter(translations__language_code='en')
+        self.assertEqual([obj.pk for obj in qs], [2])
+        self.assertEqual(Normal.objects.missing_language('ja').count(), 2)
+    
+    def test_subquery(self):
+        Standard.objects.create(pk=1, normal_field='one', normal_id=1)
+        Standard.objects.create(pk=2, normal_field='two', normal_id=2)
+        qs = Standard.objects.filter(normal__in=Normal.objects.missing_language('ja')).order_by('pk')
+        self.assertEqual([obj.pk for obj in qs], [2])
+        qs = Standard.objects.filter(normal__in=Normal.objects.untranslated())
+        self.assertEqual([obj.pk for obj in qs], [])
+        missing = Normal.objects.translation_coverage(['ja'])['ja']['missing']
+        qs = Standard.objects.filter(normal__in=missing).order_by('pk')
+        self.assertEqual([obj.pk for obj in qs], [2])
+
+
+
+class DeferTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_defer_translated(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('en').defer('translated_field'))
+        for obj in objs:
+            self.assertFalse('translated_field' in get_cached_translation(obj).__dict__)
+            with self.assertNumQueries(0):
+                self.assertEqual(obj.shared_field, DOUBLE_NORMAL[obj.pk]['shared_field'])
+                self.assertEqual(obj.language_code, 'en')
+            with self.assertNumQueries(1):
+                self.assertEqual(obj.translated_field, DOUBLE_NORMAL[obj.pk]['translated_field_en'])
+                self.assertEqual(obj.translated_field, DOUBLE_NORMAL[obj.pk]['translated_field_en'])
+    
+    def test_defer_shared(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('en').defer('shared_field'))
+        for obj in objs:
+            with self.assertNumQueries(0):
+                self.assertEqual(obj.translated_field, DOUBLE_NORMAL[obj.pk]['translated_field_en'])
+            with self.assertNumQueries(1):
+                self.assertEqual(obj.shared_field, DOUBLE_NORMAL[obj.pk]['shared_field'])
+    
+    def test_defer_language_code(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('en').defer('language_code'))
+            self.assertEqual([obj.language_code for obj in objs], ['en', 'en'])
+    
+    def test_only(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language('ja').only('shared_field'))
+            for obj in objs:
+                self.assertEqual(obj.shared_field, DOUBLE_NORMAL[obj.pk]['shared_field'])
+                self.assertEqual(obj.language_code, 'ja')
+        for obj in objs:
+            with self.assertNumQueries(1):
+                self.assertEqual(obj.translated_field, DOUBLE_NORMAL[obj.pk]['translated_field_ja'])
+
+
+class TranslationsOnlyTests(NaniTestCase):
+    fixtures = ['double_normal.json']
+    
+    def test_no_join(self):
+        qs = Normal.objects.language('en').translations_only()
+        self.assertFalse('JOIN' in str(qs.query))
+        with self.assertNumQueries(1):
+            objs = list(qs)
+        self.assertEqual(len(objs), 2)
+        for obj in objs:
+            self.assertTrue(isinstance(obj, Normal._meta.translations_model))
+            self.assertEqual(obj.translated_field, DOUBLE_NORMAL[obj.master_id]['translated_field_en'])
+    
+    def test_lazy_master(self):
+        obj = Normal.objects.language('ja').translations_only().get(master__pk=1)
+        with self.assertNumQueries(1):
+            self.assertEqual(obj.master.shared_field, DOUBLE_NORMAL[1]['shared_field'])
+    
+    def test_chaining(self):
+        with self.assertNumQueries(1):
+            titles = list(Normal.objects.translations_only().language('en').filter(
+                translated_field=DOUBLE_NORMAL[2]['translated_field_en']))
+        self.assertEqual([obj.master_id for obj in titles], [2])
+    
+    def test_fallbacks(self):
+        with self.assertNumQueries(1):
+            objs = list(Normal.objects.language(['de', 'ja']).translations_only())
+        self.assertEqual([obj.language_code for obj in objs], ['ja', 'ja'])
+    
+    def test_in_bulk(self):
+        with self.assertNumQueries(1):
+            result = Normal.objects.language('en').translations_only().in_bulk([1, 2])
+        self.assertEqual(sorted(result.keys()), [1, 2])
+        self.assertEqual(result[1].translated_field, DOUBLE_NORMAL[1]['translated_field_en'])
+
+
+class SeekTests(NaniTestCase):
+    def setUp(self):
+        # shared_field has duplicates to exercise the tiebreaker
+        objs = [Normal(pk=pk, shared_field='shared%s' % (pk % 3)) for pk in range(1, 8)]
+        languages = [{'en': {'translated_field': 'English%s' % obj.pk},
+                      'ja': {'translated_field': u'日本語%s' % obj.pk}} for obj in objs]
+        Normal.objects.bulk_create(objs, languages=languages)
+    
+    def pages(self, qs, limit):
+        pages = []
+        cursor = None
+        while True:
+            with self.assertNumQueries(1):
+                objs, cursor = qs.seek(after=cursor, limit=limit)
+            pages.append([obj.pk for obj in objs])
+            if cursor is None:
+                return pages
+    
+    def test_shared_ordering(self):
+        qs = Normal.objects.language('en').order_by('shared_field')
+        pages = self.pages(qs, 3)
+        self.assertEqual(pages, [[3, 6, 1], [4, 7, 2], [5]])
+    
+    def test_translated_ordering_descending(self):
+        qs = Normal.objects.language('ja').order_by('-translated_field')
+        pages = self.pages(qs, 2)
+        self.assertEqual(pages, [[7, 6], [5, 4], [3, 2], [1]])
+        objs, cursor = qs.seek(limit=1)
+        self.assertEqual(objs[0].translated_field, u'日本語7')
+        self.assertEqual(objs[0].language_code, 'ja')
+    
+    def test_mixed_ordering_reversed(self):
+        qs = Normal.objects.language('en').order_by('shared_field', '-translated_field').reverse()
+        expected = [obj.pk for obj in qs]
+        pages = self.pages(qs, 4)
+        self.assertEqual(pages, [expected[:4], expected[4:]])
+    
+    def test_annotated(self):
+        qs = Normal.objects.language('en').annotate(n=Count('master')).order_by('pk')
+        objs, cursor = qs.seek(limit=3)
+        self.assertEqual([(obj.pk, obj.n) for obj in objs], [(1, 1), (2, 1), (3, 1)])
+    
+    def test_master_ordering(self):
+        # the shared model is ordered by shared_field, descending
+        objs = [Ordered(pk=pk, shared_field='shared%s' % pk) for pk in range(1, 6)]
+        Ordered.objects.bulk_create(objs, languages=[{'en': {'translated_field': 'English'}}] * 5)
+        qs = Ordered.objects.language('en').order_by('master')
+        self.assertEqual(self.pages(qs, 2), [[1, 2], [3, 4], [5]])
+        qs = Ordered.objects.language('en').order_by('-master')
+        self.assertEqual(self.pages(qs, 2), [[5, 4], [3, 2], [1]])
+    
+    def test_exact_pages(self):
+        qs = Normal.objects.language('en').order_by('pk')
+        objs, cursor = qs.seek(limit=7)
+        self.assertEqual(len(objs), 7)
+        objs, cursor = qs.seek(after=cursor, limit=7)
+        self.assertEqual((objs, cursor), ([], None))
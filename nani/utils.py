@@ -1,5 +1,7 @@
+from django.db import transaction
 from django.db.models.query_utils import Q
 from django.utils.translation import get_language
+from nani.cache import translation_cache
 
 
 class R(Q):
@@ -15,16 +17,122 @@ def combine(trans):
     the shared instance.
     """
     combined = trans.master
-    opts = combined._meta
-    setattr(combined, opts.translations_cache, trans)
+    cache_translation(combined, trans)
     return combined
 
-def get_cached_translation(instance):
-    return getattr(instance, instance._meta.translations_cache, None)
+def cache_translation(instance, trans, activate=True):
+    """
+    Put 'trans' into the per-language translations cache of 'instance'.
+    
+    If 'activate' is True, it also becomes the current translation (the one
+    on the 'translations_cache' attribute) of the instance.
+    """
+    opts = instance._meta
+    cache = instance.__dict__.get(opts.translations_languages_cache, None)
+    if cache is None:
+        cache = {}
+        setattr(instance, opts.translations_languages_cache, cache)
+    cache[trans.language_code] = trans
+    if trans.master_id is not None and trans.master_id == instance.pk:
+        # avoid a query when accessing trans.master
+        setattr(trans, trans._meta.get_field('master').get_cache_name(), instance)
+    if activate:
+        setattr(instance, opts.translations_cache, trans)
+
+def get_cached_translation(instance, language_code=None):
+    """
+    Get the current translation of 'instance' or, if 'language_code' is given,
+    the cached translation in that language. Returns None if not cached.
+    """
+    opts = instance._meta
+    if language_code is None:
+        return getattr(instance, opts.translations_cache, None)
+    cache = getattr(instance, opts.translations_languages_cache, None) or {}
+    return cache.get(language_code, None)
 
 def get_translation(instance, language_code=None):
+    """
+    Get the translation of 'instance' in 'language_code'.
+    
+    'language_code' may also be a list of language codes to try in order, all
+    of which are looked up in a single query.
+    
+    Translations already in the per-language cache of 'instance' are reused,
+    fetched ones are added to it.
+    """
     opts = instance._meta
     if not language_code:
         language_code = get_language()
+    if isinstance(language_code, (list, tuple)):
+        language_codes = language_code
+    else:
+        language_codes = [language_code]
+    cached = get_cached_translation(instance, language_codes[0])
+    if cached is not None:
+        return cached
     accessor = getattr(instance, opts.translations_accessor)
-    return accessor.get(language_code=language_code)
\ No newline at end of file
+    if len(language_codes) == 1:
+        trans = None
+        if translation_cache.enabled:
+            trans = translation_cache.get_translation(instance, language_codes[0])
+        if trans is None:
+            trans = accessor.get(language_code=language_codes[0])
+            if translation_cache.enabled:
+                translation_cache.set_translation(instance.__class__, trans)
+        cache_translation(instance, trans, activate=False)
+        return trans
+    translations = {}
+    for trans in accessor.filter(language_code__in=language_codes):
+        translations[trans.language_code] = trans
+        cache_translation(instance, trans, activate=False)
+    for code in language_codes:
+        if code in translations:
+            return translations[code]
+    raise opts.translations_model.DoesNotExist(
+        "%s matching query does not exist." % opts.translations_model._meta.object_name
+    )
+
+def load_deferred_fields(trans):
+    """
+    Load all deferred fields of the translation 'trans' with a single query.
+    """
+    deferred = [field for field in trans._meta.fields
+                if field.attname not in trans.__dict__]
+    if not deferred:
+        return
+    manager = trans.__class__._base_manager
+    values = manager.using(trans._state.db).filter(pk=trans.pk).values(
+        *[field.name for field in deferred]
+    )[0]
+    for field in deferred:
+        trans.__dict__[field.attname] = values[field.name]
+        trans._saved_values[field.attname] = values[field.name]
+
+
+def commit_on_success(using, func, *args, **kwargs):
+    """
+    Call func in a transaction on the database 'using', committing it at the
+    end (or rolling it back if func raises) unless the transaction is managed
+    by the caller.
+    """
+    if not transaction.is_managed(using=using):
+        transaction.enter_transaction_management(using=using)
+        transaction.managed(True, using=using)
+        forced_managed = True
+    else:
+        forced_managed = False
+    try:
+        try:
+            result = func(*args, **kwargs)
+        except:
+            if forced_managed:
+                transaction.rollback(using=using)
+            raise
+        if forced_managed:
+            transaction.commit(using=using)
+        else:
+            transaction.commit_unless_managed(using=using)
+        return result
+    finally:
+        if forced_managed:
+            transaction.leave_transaction_management(using=using)
@@ -27,5 +27,16 @@ class Date(TranslateableModel):
     shared_date = models.DateTimeField()
     
     translated_fields = TranslatedFields(
-        translated_date = models.DateTimeField()
-    )
\ No newline at end of file
+        translated_date = models.DateTimeField(),
+        meta={'index_together': [('language_code', 'translated_date')]},
+    )
+
+class Ordered(TranslateableModel):
+    shared_field = models.CharField(max_length=255)
+    
+    translations = TranslatedFields(
+        translated_field = models.CharField(max_length=255)
+    )
+    
+    class Meta:
+        ordering = ['-shared_field']